@@ -0,0 +1,3 @@
+"""
+Benchmarks for the extension views against a local fake Docker daemon
+"""
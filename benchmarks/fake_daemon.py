@@ -0,0 +1,467 @@
+"""
+Stand-in Docker Engine API served on a unix socket
+
+Serves just enough of the API for the extension views: /_ping, /version,
+/info, /containers/json, /containers/{id}/json, /containers/{id}/logs,
+/events and /system/df, with a configurable number of containers and
+injected latency. Every request is counted so benchmarks can report API
+calls per query.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import re
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+API_VERSION = '1.45'
+
+PROJECTS = ['billing', 'search', 'auth', 'checkout', 'reports', 'mailer']
+SERVICES = ['api', 'worker', 'db', 'redis', 'nginx', 'scheduler']
+IMAGES = {
+    'api': 'python:3.12-slim',
+    'worker': 'python:3.12-slim',
+    'db': 'postgres:16',
+    'redis': 'redis:7',
+    'nginx': 'nginx:1.27',
+    'scheduler': 'alpine:3.20',
+}
+
+_VERSION_PREFIX = re.compile(r'^/v[0-9.]+')
+_INSPECT_PATH = re.compile(r'^/containers/([^/]+)/json$')
+_LOGS_PATH = re.compile(r'^/containers/([^/]+)/logs$')
+
+# Lines logged by every container before the daemon starts
+LOG_HISTORY = 2000
+
+# Seconds between two lines of a followed container
+LOG_INTERVAL = 0.5
+
+
+def make_containers(count):
+    """
+    Generates deterministic /containers/json entries. Four out of five
+    containers are running and all belong to a compose project.
+    """
+    containers = []
+    for i in range(count):
+        project = PROJECTS[i % len(PROJECTS)]
+        service = SERVICES[(i // len(PROJECTS)) % len(SERVICES)]
+        running = i % 5 != 4
+        container_id = hashlib.sha256(b'container-%d' % i).hexdigest()
+        containers.append({
+            'Id': container_id,
+            'Names': ['/%s-%s-%d' % (project, service, i)],
+            'Image': IMAGES[service],
+            'ImageID': 'sha256:%064x' % (i % 12),
+            'Command': 'run',
+            'Created': 1700000000 + i,
+            'Ports': [{
+                'IP': '0.0.0.0',
+                'PrivatePort': 8000,
+                'PublicPort': 10000 + i,
+                'Type': 'tcp'
+            }] if running else [],
+            'Labels': {
+                'com.docker.compose.project': project,
+                'com.docker.compose.service': service,
+            },
+            'State': 'running' if running else 'exited',
+            'Status': 'Up 2 hours' if running else 'Exited (0) 1 hour ago',
+            'HostConfig': {'NetworkMode': '%s_default' % project},
+            'NetworkSettings': {
+                'Networks': {
+                    '%s_default' % project: {
+                        'IPAddress': '172.18.%d.%d' % (i // 250, i % 250 + 2) if running else ''
+                    }
+                }
+            },
+            'Mounts': [],
+        })
+    return containers
+
+
+def inspect_payload(container):
+    """ Builds a /containers/{id}/json payload from a list entry """
+    networks = container['NetworkSettings']['Networks']
+    ports = {}
+    for port in container['Ports']:
+        ports['%d/%s' % (port['PrivatePort'], port['Type'])] = [{
+            'HostIp': port['IP'],
+            'HostPort': str(port['PublicPort'])
+        }]
+    return {
+        'Id': container['Id'],
+        'Name': container['Names'][0],
+        'Created': '2024-01-01T00:00:00Z',
+        'Config': {
+            'Tty': False,
+            'Image': container['Image'],
+            'Labels': container['Labels']
+        },
+        'State': {
+            'Status': container['State'],
+            'Running': container['State'] == 'running'
+        },
+        'NetworkSettings': {
+            'IPAddress': '',
+            'Ports': ports,
+            'Networks': networks
+        },
+    }
+
+
+def _matches(container, filters):
+    for status in filters.get('status', []):
+        if container['State'] != status:
+            return False
+    for container_id in filters.get('id', []):
+        if not container['Id'].startswith(container_id):
+            return False
+    for name in filters.get('name', []):
+        if name not in container['Names'][0]:
+            return False
+    return True
+
+
+class FakeDockerState():
+    """ Containers served by the fake daemon and request accounting """
+
+    def __init__(self, count, latency=0.0):
+        self.latency = latency
+        self.containers = make_containers(count)
+        self.by_id = {c['Id']: c for c in self.containers}
+        self.requests = Counter()
+        self.started_at = time.time()
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def reset_counters(self):
+        """ Clears the request counters """
+        with self.lock:
+            self.requests.clear()
+
+    def total_requests(self):
+        """ Number of requests served since the last reset """
+        with self.lock:
+            return sum(self.requests.values())
+
+    def emit(self, action, container_id):
+        """ Pushes a container event to every /events subscriber """
+        event = {
+            'Type': 'container',
+            'Action': action,
+            'id': container_id,
+            'Actor': {
+                'ID': container_id,
+                'Attributes': {}
+            },
+            'time': int(time.time()),
+        }
+        for subscriber in list(self.subscribers):
+            subscriber.put(event)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeDocker/' + API_VERSION
+
+    def address_string(self):
+        return 'unix'
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._dispatch()
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        self._dispatch()
+
+    def _dispatch(self):
+        state = self.server.state
+        url = urlparse(self.path)
+        path = _VERSION_PREFIX.sub('', url.path)
+        params = parse_qs(url.query)
+
+        with state.lock:
+            state.requests[self._route_name(path)] += 1
+        if state.latency:
+            time.sleep(state.latency)
+
+        if path == '/_ping':
+            return self._send_text('OK')
+        if path == '/version':
+            return self._send_json({
+                'Version': '27.0.0-fake',
+                'ApiVersion': API_VERSION,
+                'MinAPIVersion': '1.24',
+                'Os': 'linux',
+                'Arch': 'amd64'
+            })
+        if path == '/info':
+            return self._send_json(self._info())
+        if path == '/system/df':
+            return self._send_json(self._df())
+        if path == '/containers/json':
+            return self._send_json(self._list(params))
+        if path == '/events':
+            return self._stream_events(state)
+
+        match = _LOGS_PATH.match(path)
+        if match:
+            container = self._find(match.group(1))
+            if container is None:
+                return self._send_json({'message': 'No such container'}, 404)
+            return self._stream_logs(state, container, params)
+
+        match = _INSPECT_PATH.match(path)
+        if match:
+            container = self._find(match.group(1))
+            if container is None:
+                return self._send_json({'message': 'No such container'}, 404)
+            return self._send_json(inspect_payload(container))
+
+        self._send_json({'message': 'page not found'}, 404)
+
+    @staticmethod
+    def _route_name(path):
+        if _INSPECT_PATH.match(path):
+            return '/containers/{id}/json'
+        if _LOGS_PATH.match(path):
+            return '/containers/{id}/logs'
+        return path
+
+    def _find(self, container_id):
+        state = self.server.state
+        container = state.by_id.get(container_id)
+        if container is None:
+            for candidate in state.containers:
+                if candidate['Id'].startswith(container_id) or \
+                        candidate['Names'][0] == '/' + container_id:
+                    return candidate
+        return container
+
+    def _list(self, params):
+        state = self.server.state
+        filters = json.loads(params.get('filters', ['{}'])[0] or '{}')
+        # Filters are either {"key": ["value"]} or {"key": {"value": true}}
+        filters = {
+            key: list(value) if isinstance(value, (list, dict)) else [value]
+            for key, value in filters.items()
+        }
+        show_all = params.get('all', ['0'])[0] in ('1', 'true', 'True')
+        limit = int(params.get('limit', ['-1'])[0])
+
+        result = []
+        for container in state.containers:
+            if not show_all and container['State'] != 'running':
+                continue
+            if _matches(container, filters):
+                result.append(container)
+        if limit > 0:
+            result = result[:limit]
+        return result
+
+    def _info(self):
+        containers = self.server.state.containers
+        running = sum(1 for c in containers if c['State'] == 'running')
+        return {
+            'Containers': len(containers),
+            'ContainersRunning': running,
+            'ContainersPaused': 0,
+            'ContainersStopped': len(containers) - running,
+            'Images': len(IMAGES),
+            'Driver': 'overlay2',
+            'OperatingSystem': 'Fake Linux',
+            'NCPU': 8,
+            'MemTotal': 16 * 1024 ** 3,
+            'ServerVersion': '27.0.0-fake',
+        }
+
+    def _df(self):
+        containers = self.server.state.containers
+        return {
+            'LayersSize': 4 * 1000 ** 3,
+            'Images': [{
+                'Id': 'sha256:%064x' % i,
+                'Containers': 1 if i < 6 else 0,
+                'Size': 200 * 1000 ** 2,
+                'SharedSize': 50 * 1000 ** 2
+            } for i in range(12)],
+            'Containers': [{
+                'Id': c['Id'],
+                'State': c['State'],
+                'SizeRw': 1000 ** 2
+            } for c in containers],
+            'Volumes': [{
+                'Name': 'vol%d' % i,
+                'UsageData': {
+                    'RefCount': i % 2,
+                    'Size': 10 * 1000 ** 2
+                }
+            } for i in range(20)],
+            'BuildCache': [{
+                'ID': 'cache%d' % i,
+                'InUse': False,
+                'Shared': False,
+                'Size': 5 * 1000 ** 2
+            } for i in range(10)],
+        }
+
+    def _send_text(self, text, status=200):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Api-Version', API_VERSION)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Api-Version', API_VERSION)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_events(self, state):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        self.wfile.flush()
+
+        events = queue.Queue()
+        state.subscribers.append(events)
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    break
+                chunk = (json.dumps(event) + '\n').encode('utf-8')
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+                self.wfile.flush()
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            state.subscribers.remove(events)
+            self.close_connection = True
+
+    def _stream_logs(self, state, container, params):
+        """ Multiplexed stdout frames, one line per LOG_INTERVAL seconds """
+        tail = params.get('tail', ['all'])[0]
+        since = float(params.get('since', ['0'])[0] or 0)
+        timestamps = params.get('timestamps', ['0'])[0] in ('1', 'true', 'True')
+        follow = params.get('follow', ['0'])[0] in ('1', 'true', 'True')
+
+        def line(number):
+            when = state.started_at - (LOG_HISTORY - number) * LOG_INTERVAL
+            text = '%s request %d served in %dms\n' % (
+                'ERROR' if number % 50 == 0 else 'INFO', number, number % 97)
+            if timestamps:
+                text = '%s.%09dZ %s' % (time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(when)),
+                                        int(when % 1 * 1e9), text)
+            return when, text.encode('utf-8')
+
+        def frame(payload):
+            data = struct.pack('>BxxxL', 1, len(payload)) + payload
+            return b'%x\r\n%s\r\n' % (len(data), data)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.docker.raw-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        running = container['State'] == 'running'
+        # Running containers keep logging while the daemon is up
+        history = LOG_HISTORY + int((time.time() - state.started_at) / LOG_INTERVAL) \
+            if running else LOG_HISTORY // 2
+        lines = [line(n) for n in range(history)]
+        lines = [payload for when, payload in lines if when >= since]
+        if tail != 'all':
+            lines = lines[-int(tail):] if int(tail) else []
+        try:
+            if lines:
+                self.wfile.write(frame(b''.join(lines)))
+                self.wfile.flush()
+            number = history
+            while follow and running:
+                time.sleep(LOG_INTERVAL)
+                self.wfile.write(frame(line(number)[1]))
+                self.wfile.flush()
+                number += 1
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.close_connection = True
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class FakeDockerDaemon():
+    """
+    Runs the fake Engine API on a unix socket in a background thread.
+
+        with FakeDockerDaemon('/tmp/fake-docker.sock', count=1000) as daemon:
+            os.environ['DOCKER_HOST'] = daemon.url
+    """
+
+    def __init__(self, socket_path, count=100, latency=0.0):
+        self.socket_path = socket_path
+        self.state = FakeDockerState(count, latency)
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """ The DOCKER_HOST value pointing to this daemon """
+        return 'unix://' + self.socket_path
+
+    def start(self):
+        """ Starts serving in a background thread """
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = _Server(self.socket_path, _Handler)
+        self._server.state = self.state
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="fake-dockerd",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stops serving and closes the open event streams """
+        for subscriber in list(self.state.subscribers):
+            subscriber.put(None)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
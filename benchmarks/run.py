@@ -0,0 +1,193 @@
+"""
+Measures the extension views against the fake Docker daemon
+
+    python -m benchmarks.run --counts 10 100 1000 5000 --latency 0.002
+
+For every container count it reports the keystroke to RenderResultListAction
+latency (p50/p95/max), the Docker API calls issued per query and the peak
+Python memory of the run. Requires the extension dependencies (Ulauncher,
+docker) to be importable.
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.fake_daemon import FakeDockerDaemon
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Typed one char at a time after the "dk" keyword
+TYPED_QUERY = 'billing api'
+
+
+class BenchQuery():
+    """ The subset of KeywordQueryEvent used by KeywordQueryEventListener """
+
+    def __init__(self, keyword, argument):
+        self.keyword = keyword
+        self.argument = argument
+
+    def get_keyword(self):
+        return self.keyword
+
+    def get_argument(self):
+        return self.argument
+
+
+def load_preferences():
+    """ The manifest default preferences, as Ulauncher would provide them """
+    with open(os.path.join(ROOT, 'manifest.json')) as manifest:
+        return {
+            pref['id']: pref.get('default_value', '')
+            for pref in json.load(manifest)['preferences']
+        }
+
+
+def percentile(values, pct):
+    """ Nearest rank percentile of a list of numbers """
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100.0 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def wait_for(predicate, timeout):
+    """ Polls predicate until it is true or the timeout expires """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def measure(label, calls, daemon):
+    """
+    Times each call and counts the API requests it triggered
+    Args:
+      label (str): Name of the measurement
+      calls (list): Zero argument callables returning a render action
+      daemon (FakeDockerDaemon): The daemon whose requests are counted
+    """
+    timings = []
+    daemon.state.reset_counters()
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'view': label,
+        'samples': len(timings),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'max_ms': round(max(timings), 3),
+        'api_calls': round(daemon.state.total_requests() / float(len(calls)), 2),
+    }
+
+
+def run_scenario(count, latency, repeat):
+    """ Benchmarks the views against a daemon serving count containers """
+    from dk.extension import DockerExtension
+    from dk.listeners.query_listener import KeywordQueryEventListener
+
+    socket_path = os.path.join(tempfile.mkdtemp(prefix='dk-bench-'), 'docker.sock')
+    with FakeDockerDaemon(socket_path, count=count, latency=latency) as daemon:
+        os.environ['DOCKER_HOST'] = daemon.url
+        tracemalloc.start()
+
+        extension = DockerExtension()
+        extension.preferences = load_preferences()
+        listener = KeywordQueryEventListener()
+        keyword = extension.preferences['kw']
+
+        # Queries render on the scheduler thread, wait for each result
+        responses = queue.Queue()
+        extension.queries.send = lambda event, action: responses.put(action)
+
+        def query(keyword, argument):
+            def call():
+                listener.on_event(BenchQuery(keyword, argument), extension)
+                return responses.get(timeout=60)
+            return call
+
+        results = [measure('list (cold start)', [query(keyword, 'b')], daemon)]
+
+        host = extension.hosts.primary
+        if not wait_for(lambda: host.index.ready, timeout=60):
+            raise RuntimeError('container index never became ready')
+
+        prefixes = [TYPED_QUERY[:i] for i in range(1, len(TYPED_QUERY) + 1)]
+        results.append(
+            measure('list (typing)', [query(keyword, p) for p in prefixes] * repeat,
+                    daemon))
+
+        running = [c for c in host.index.all() if c.status == 'running']
+        target = running[-1].id
+        results.append(
+            measure('details (first open)',
+                    [lambda: extension.show_container_details(target)], daemon))
+        results.append(
+            measure('details (reopen)',
+                    [lambda: extension.show_container_details(target)] * repeat,
+                    daemon))
+
+        info_keyword = extension.preferences['kw_info']
+        results.append(measure('info (first open)', [query(info_keyword, '')], daemon))
+        wait_for(lambda: host.disk_usage.value is not None, timeout=30)
+        results.append(
+            measure('info (reopen)', [query(info_keyword, '')] * repeat, daemon))
+
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        extension.hosts.close()
+        extension.jobs.shutdown()
+
+    for result in results:
+        result['containers'] = count
+        result['peak_mem_kb'] = round(peak / 1024.0)
+    return results
+
+
+def print_table(results):
+    """ Prints the results as an aligned text table """
+    columns = ['containers', 'view', 'samples', 'p50_ms', 'p95_ms', 'max_ms',
+               'api_calls', 'peak_mem_kb']
+    widths = {
+        c: max(len(c), *(len(str(r[c])) for r in results))
+        for c in columns
+    }
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    for result in results:
+        print('  '.join(str(result[c]).ljust(widths[c]) for c in columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 1000, 5000],
+                        help='container counts to benchmark')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds of latency injected in every API call')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='repetitions of the warm measurements')
+    parser.add_argument('--json', action='store_true',
+                        help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    results = []
+    for count in args.counts:
+        results.extend(run_scenario(count, args.latency, args.repeat))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,3 +5,15 @@ ACTION_START_CONTAINER = "container.start"
 ACTION_STOP_CONTAINER = "container.stop"
 ACTION_RESTART_CONTAINER = "container.restart"
 ACTION_DETAIL_CONTAINER = "container.details"
+ACTION_BULK_START = "containers.start"
+ACTION_BULK_STOP = "containers.stop"
+ACTION_BULK_RESTART = "containers.restart"
+ACTION_PRUNE = "system.prune"
+ACTION_METRICS_DUMP = "metrics.dump"
+ACTION_PROJECT_DETAILS = "project.details"
+ACTION_PROJECT_START = "project.start"
+ACTION_PROJECT_STOP = "project.stop"
+ACTION_PROJECT_RESTART = "project.restart"
+ACTION_IMAGE_DETAILS = "image.details"
+ACTION_IMAGE_REMOVE = "image.remove"
+ACTION_IMAGE_PULL = "image.pull"
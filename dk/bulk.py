@@ -0,0 +1,155 @@
+"""
+Parallel lifecycle operations over several containers at once
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from dk.search import COMPOSE_PROJECT_LABEL, COMPOSE_SERVICE_LABEL
+
+logger = logging.getLogger(__name__)
+
+DEPENDS_ON_LABEL = 'com.docker.compose.depends_on'
+
+# Maximum number of daemon calls issued concurrently by a bulk operation
+BULK_CONCURRENCY = 6
+
+OPERATION_START = 'start'
+OPERATION_STOP = 'stop'
+OPERATION_RESTART = 'restart'
+
+_PAST_TENSE = {
+    OPERATION_START: 'Started',
+    OPERATION_STOP: 'Stopped',
+    OPERATION_RESTART: 'Restarted',
+}
+
+
+def parse_depends_on(value):
+    """
+    Parses the compose depends_on label into the set of service names.
+    The label looks like "db:service_healthy:false,cache:service_started:true"
+    """
+    services = set()
+    for entry in (value or "").split(','):
+        service = entry.split(':', 1)[0].strip()
+        if service:
+            services.add(service)
+    return services
+
+
+def dependency_levels(containers):
+    """
+    Groups containers into levels where each level only depends on the
+    previous ones, following the compose depends_on label. Containers of a
+    level can be started in parallel. Cycles and unknown services are ignored.
+    Args:
+      containers (list): ContainerSummary records
+    Returns:
+      list: Lists of containers, dependencies first
+    """
+    by_service = {}
+    depends = {}
+    for container in containers:
+        labels = container.labels or {}
+        project = labels.get(COMPOSE_PROJECT_LABEL)
+        service = labels.get(COMPOSE_SERVICE_LABEL)
+        if service:
+            by_service.setdefault((project, service), []).append(container)
+        depends[container.id] = {
+            (project, dep)
+            for dep in parse_depends_on(labels.get(DEPENDS_ON_LABEL))
+        }
+
+    # Only dependencies that are part of this operation constrain the order
+    services = set(by_service)
+    for deps in depends.values():
+        deps &= services
+
+    levels = []
+    placed = set()
+    remaining = list(containers)
+    while remaining:
+        ready = {
+            key
+            for key, members in by_service.items()
+            if all(c.id in placed for c in members)
+        }
+        level = [c for c in remaining if depends[c.id] <= ready]
+        if not level:
+            # Dependency cycle: run whatever is left together
+            level = remaining
+        levels.append(level)
+        placed.update(c.id for c in level)
+        remaining = [c for c in remaining if c.id not in placed]
+    return levels
+
+
+class BulkOperation():
+    """
+    Runs a lifecycle operation over several containers, in dependency order
+    and with a bounded number of concurrent daemon calls, then reports a
+    single aggregated summary.
+    """
+
+    def __init__(self, clients, operation, containers, grace_period=10,
+                 concurrency=BULK_CONCURRENCY):
+        """
+        Args:
+          clients (dict): Docker clients by host name
+          operation (str): One of the OPERATION_* constants
+          containers (list): ContainerSummary records, tagged with their host
+          grace_period (int): Seconds given to containers to stop
+          concurrency (int): Maximum number of concurrent daemon calls
+        """
+        self.clients = clients
+        self.operation = operation
+        self.containers = containers
+        self.grace_period = grace_period
+        self.concurrency = concurrency
+
+    def run(self):
+        """
+        Executes the operation
+        Returns:
+          tuple: (succeeded, failed) lists of container names
+        """
+        levels = dependency_levels(self.containers)
+        if self.operation == OPERATION_STOP:
+            # Stop dependents before the services they depend on
+            levels.reverse()
+
+        succeeded, failed = [], []
+        workers = max(1, min(self.concurrency, len(self.containers)))
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix="dk-bulk") as pool:
+            for level in levels:
+                results = pool.map(self._apply, level)
+                for container, ok in zip(level, results):
+                    (succeeded if ok else failed).append(container.name)
+        return succeeded, failed
+
+    def summary(self, succeeded, failed):
+        """ Builds the notification text for the operation results """
+        total = len(succeeded) + len(failed)
+        text = "%s %d/%d containers" % (_PAST_TENSE[self.operation],
+                                        len(succeeded), total)
+        if failed:
+            text += " (failed: %s)" % ', '.join(sorted(failed))
+        return text
+
+    def _apply(self, container):
+        # Low level calls avoid an inspect per container
+        api = self.clients[container.host].api
+        try:
+            if self.operation == OPERATION_START:
+                api.start(container.id)
+            elif self.operation == OPERATION_STOP:
+                api.stop(container.id, timeout=self.grace_period)
+            else:
+                api.restart(container.id, timeout=self.grace_period)
+            return True
+        except Exception as e:
+            logger.error("Failed to %s container %s: %s", self.operation,
+                         container.name, e)
+            return False
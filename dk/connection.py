@@ -0,0 +1,211 @@
+"""
+Lazy, self-healing connection to the Docker daemon
+"""
+
+import logging
+import os
+import threading
+import time
+
+from dk.metrics import instrument_client
+
+logger = logging.getLogger(__name__)
+
+STATE_IDLE = 'idle'
+STATE_CONNECTING = 'connecting'
+STATE_CONNECTED = 'connected'
+STATE_DISCONNECTED = 'disconnected'
+
+
+def is_ssh(url):
+    """ Whether a daemon URL goes over ssh:// """
+    return bool(url) and url.startswith('ssh://')
+
+
+class DockerConnection():
+    """
+    Small state machine around the docker client.
+
+    idle -> connecting -> connected
+                       -> disconnected -> (backoff) -> connecting ...
+
+    Nothing happens until the first query asks for the client. When the
+    daemon is unreachable, or a consumer reports a connection error, a
+    background thread keeps retrying with exponential backoff so the
+    extension recovers as soon as dockerd is (re)started.
+    """
+
+    RETRY_DELAY = 1
+    MAX_RETRY_DELAY = 30
+
+    # Seconds to wait for the daemon on the query path
+    CONNECT_TIMEOUT = 3
+
+    # Seconds allowed to regular API calls once connected
+    REQUEST_TIMEOUT = 60
+
+    def __init__(self, on_connect=None, endpoint=None):
+        """
+        Args:
+          on_connect (callable): Called with the client after every
+            successful (re)connection
+          endpoint (str): A daemon URL (unix://, tcp://, ssh://...) or a
+            docker context name. None uses the environment (DOCKER_HOST)
+        """
+        self.on_connect = on_connect
+        self.endpoint = endpoint
+        self.state = STATE_IDLE
+        self.client = None
+        self.last_error = None
+        self.next_retry = None
+        self._lock = threading.Lock()
+        self._retrying = False
+        # Set by close(), ends the retry loop of a host that was removed
+        self._closed = threading.Event()
+
+    @property
+    def available(self):
+        """ Returns True when the daemon is reachable, connecting lazily """
+        if self.state == STATE_IDLE:
+            self.connect()
+        return self.state == STATE_CONNECTED
+
+    def connect(self):
+        """ Connects to the daemon, scheduling retries on failure """
+        with self._lock:
+            if self._closed.is_set() or self.state in (STATE_CONNECTING, STATE_CONNECTED):
+                return
+            self.state = STATE_CONNECTING
+
+        if not self._attempt():
+            self._schedule_retry()
+
+    def connect_in_background(self):
+        """ Starts connecting without blocking the caller """
+        if self.state == STATE_IDLE:
+            threading.Thread(target=self.connect,
+                             name="dk-connect",
+                             daemon=True).start()
+
+    def close(self):
+        """ Stops reconnecting and releases the client """
+        self._closed.set()
+        client = self.client
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug("Failed to close the docker client: %s", e)
+
+    def report_error(self, error):
+        """
+        Flags the connection as broken after a consumer hit a daemon error
+        Args:
+          error (Exception): The error raised by the docker client
+        """
+        with self._lock:
+            if self.state != STATE_CONNECTED:
+                return
+            self.state = STATE_DISCONNECTED
+            self.last_error = error
+        logger.warning("Lost connection to the Docker daemon: %s", error)
+        self._schedule_retry()
+
+    def status(self):
+        """ Returns a (title, description) tuple describing the health """
+        if self.state == STATE_CONNECTING:
+            return ('Connecting to Docker...', 'Waiting for the Docker Daemon')
+        if self.state == STATE_DISCONNECTED:
+            description = 'Please start the Docker Daemon'
+            if self.next_retry:
+                description += ' (retrying in %ds)' % max(
+                    0, self.next_retry - time.monotonic())
+            return ('Docker is not running', description)
+        return ('Docker is running', '')
+
+    def _attempt(self):
+        """ Tries a single connection, returns True on success """
+        try:
+            # PERFORMANCE: Imported here to keep it off the startup path
+            import docker
+            client = self.client or self._create_client(docker)
+            instrument_client(client)
+            client.api.timeout = self.CONNECT_TIMEOUT
+            client.ping()
+            client.api.timeout = self.REQUEST_TIMEOUT
+        except Exception as e:
+            with self._lock:
+                self.state = STATE_DISCONNECTED
+                self.last_error = e
+            logger.warning("Docker Daemon not available: %s", e)
+            return False
+
+        if self._closed.is_set():
+            # The host was removed while connecting
+            client.close()
+            return False
+
+        # The host caches are built before CONNECTED is published, views
+        # never see a connected host without its snapshots
+        self.client = client
+        if self.on_connect is not None:
+            try:
+                self.on_connect(client)
+            except Exception as e:
+                logger.error("Docker connection callback failed: %s", e)
+
+        with self._lock:
+            self.state = STATE_CONNECTED
+            self.last_error = None
+            self.next_retry = None
+            self._retrying = False
+        return True
+
+    def _create_client(self, docker):
+        """
+        Builds the client for the configured endpoint. ssh:// daemons are
+        reached through the ssh binary, like the docker CLI does, so the
+        user ssh config and agent apply
+        """
+        if not self.endpoint:
+            host = os.environ.get('DOCKER_HOST')
+            if not host:
+                from docker.context import ContextAPI
+                context = ContextAPI.get_current_context()
+                host = context.Host if context is not None else None
+            return docker.from_env(timeout=self.CONNECT_TIMEOUT,
+                                   use_ssh_client=is_ssh(host))
+
+        if '://' in self.endpoint:
+            return docker.DockerClient(base_url=self.endpoint,
+                                       timeout=self.CONNECT_TIMEOUT,
+                                       use_ssh_client=is_ssh(self.endpoint))
+
+        from docker.context import ContextAPI
+        context = ContextAPI.get_context(self.endpoint)
+        if context is None:
+            raise ValueError("Unknown docker context: %s" % self.endpoint)
+        return docker.DockerClient(base_url=context.Host,
+                                   tls=context.TLSConfig,
+                                   timeout=self.CONNECT_TIMEOUT,
+                                   use_ssh_client=is_ssh(context.Host))
+
+    def _schedule_retry(self):
+        with self._lock:
+            if self._retrying:
+                return
+            self._retrying = True
+        threading.Thread(target=self._retry_loop,
+                         name="dk-reconnect",
+                         daemon=True).start()
+
+    def _retry_loop(self):
+        delay = self.RETRY_DELAY
+        while True:
+            self.next_retry = time.monotonic() + delay
+            if self._closed.wait(delay):
+                return
+            if self._attempt():
+                logger.info("Connected to the Docker daemon")
+                return
+            delay = min(delay * 2, self.MAX_RETRY_DELAY)
@@ -0,0 +1,237 @@
+"""
+In-memory container index kept current by the Docker events stream
+"""
+
+import logging
+import threading
+import time
+
+from dk.container_summary import list_summaries
+from dk.query import parse_query
+from dk.search import ContainerMatcher
+
+logger = logging.getLogger(__name__)
+
+# Container events that change what the list view shows
+WATCHED_EVENTS = [
+    'create', 'start', 'restart', 'stop', 'die', 'kill', 'pause', 'unpause',
+    'rename', 'destroy'
+]
+
+# Network events that change the addresses of a container
+NETWORK_EVENTS = ['connect', 'disconnect']
+
+
+class ContainerIndex():
+    """ Thread-safe in-memory index of the daemon containers """
+
+    def __init__(self, host=''):
+        """
+        Args:
+          host (str): Name of the daemon the containers belong to. Indexed
+            records are tagged with it
+        """
+        self.host = host
+        self._lock = threading.RLock()
+        self._containers = {}
+        self._matcher = ContainerMatcher()
+        self._listeners = []
+        self.ready = False
+
+    def subscribe(self, callback):
+        """
+        Registers a callback invoked with the id of every container that
+        changes, or with None when the whole index is replaced
+        """
+        self._listeners.append(callback)
+
+    def _changed(self, container_id):
+        for callback in self._listeners:
+            try:
+                callback(container_id)
+            except Exception as e:
+                logger.error("Container index listener failed: %s", e)
+
+    def replace(self, containers):
+        """
+        Replaces the whole index with a fresh container list
+        Args:
+          containers (list): The ContainerSummary records to index
+        """
+        for container in containers:
+            container.host = self.host
+        with self._lock:
+            self._containers = {c.id: c for c in containers}
+            self._matcher.clear()
+            for container in self._containers.values():
+                self._matcher.add(container)
+            self.ready = True
+        self._changed(None)
+
+    def upsert(self, container):
+        """ Adds or refreshes a single container """
+        container.host = self.host
+        with self._lock:
+            self._containers[container.id] = container
+            self._matcher.add(container)
+        self._changed(container.id)
+
+    def remove(self, container_id):
+        """ Drops a container from the index """
+        with self._lock:
+            self._containers.pop(container_id, None)
+            self._matcher.remove(container_id)
+        self._changed(container_id)
+
+    def invalidate(self):
+        """ Marks the index as out of sync with the daemon """
+        self.ready = False
+        self._changed(None)
+
+    def get(self, container_id):
+        """ Returns the container with the specified id, if indexed """
+        with self._lock:
+            return self._containers.get(container_id)
+
+    def resolve(self, container_id):
+        """
+        Returns the container with the specified full or short id, if indexed
+        """
+        with self._lock:
+            container = self._containers.get(container_id)
+            if container is not None or not container_id:
+                return container
+            return next((c for cid, c in self._containers.items()
+                         if cid.startswith(container_id)), None)
+
+    def all(self):
+        """ Returns a snapshot of all the indexed containers """
+        with self._lock:
+            return list(self._containers.values())
+
+    def search(self, query, only_running=True, limit=8, with_scores=False,
+               boost=None):
+        """
+        Returns the indexed containers ranked by relevance to the query.
+        The limit is applied after ranking so the best match is never cut.
+        Args:
+          query (str|ContainerQuery): Free text matched against name, image,
+            id, ports and compose labels, with optional status:, image:,
+            label:, project:, service: and port: filters
+          only_running (bool): Skip containers that are not running, unless
+            the query filters on the status itself
+          limit (int): Maximum number of containers returned
+          with_scores (bool): Return (score, container) tuples, used to merge
+            results of several indexes
+          boost (callable): Optional score bonus by lowercase container name
+        """
+        query = parse_query(query)
+        with self._lock:
+            containers = self._containers
+            predicate = None
+            if only_running and not query.has_status:
+                predicate = lambda cid: containers[cid].status == 'running'  # noqa: E731
+            ranked = self._matcher.rank(query.text, limit=limit, predicate=predicate,
+                                        with_scores=True, filters=query.filters,
+                                        boost=boost)
+            if with_scores:
+                return [(score, containers[cid]) for score, cid in ranked]
+            return [containers[cid] for _, cid in ranked]
+
+
+class ContainerWatcher(threading.Thread):
+    """
+    Background thread that seeds the index with a single list call and then
+    follows the daemon events stream to keep it current. When the stream
+    drops, the index is flagged as stale and fully resynced.
+    """
+
+    RETRY_DELAY = 1
+    MAX_RETRY_DELAY = 30
+
+    def __init__(self, docker_client, index, on_error=None):
+        """
+        Args:
+          docker_client (docker.DockerClient): The client to follow
+          index (ContainerIndex): The index to keep current
+          on_error (callable): Called with the exception when a sync fails
+        """
+        super(ContainerWatcher, self).__init__(name="dk-container-watcher",
+                                               daemon=True)
+        self.docker_client = docker_client
+        self.index = index
+        self.on_error = on_error
+        self._stopped = threading.Event()
+        self._stream = None
+
+    def stop(self):
+        """ Stops following the events stream """
+        self._stopped.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception as e:
+                logger.debug("Failed to close events stream: %s", e)
+
+    def run(self):
+        delay = self.RETRY_DELAY
+        while not self._stopped.is_set():
+            try:
+                self._sync()
+                delay = self.RETRY_DELAY
+            except Exception as e:
+                logger.warning("Container events stream dropped: %s", e)
+                if self.on_error is not None:
+                    self.on_error(e)
+
+            self.index.invalidate()
+            if self._stopped.wait(delay):
+                break
+            delay = min(delay * 2, self.MAX_RETRY_DELAY)
+
+    def _sync(self):
+        """ Seeds the index and applies events until the stream ends """
+        since = int(time.time())
+        self.index.replace(list_summaries(self.docker_client, all=True))
+        logger.debug("Container index seeded")
+
+        self._stream = self.docker_client.events(
+            since=since,
+            decode=True,
+            filters={
+                'type': ['container', 'network'],
+                'event': WATCHED_EVENTS + NETWORK_EVENTS
+            })
+        try:
+            for event in self._stream:
+                if self._stopped.is_set():
+                    break
+                self._apply(event)
+        finally:
+            self._stream = None
+
+    def _apply(self, event):
+        """ Applies a single daemon event to the index """
+        action = event.get('Action') or event.get('status')
+        if event.get('Type') == 'network':
+            # The actor is the network, the container is an attribute
+            if action not in NETWORK_EVENTS:
+                return
+            container_id = (event.get('Actor', {}).get('Attributes') or {}).get('container')
+        else:
+            container_id = event.get('id') or event.get('Actor', {}).get('ID')
+        if not container_id:
+            return
+
+        if action == 'destroy':
+            self.index.remove(container_id)
+            return
+
+        found = list_summaries(self.docker_client,
+                               all=True,
+                               filters={'id': container_id})
+        if found:
+            self.index.upsert(found[0])
+        else:
+            self.index.remove(container_id)
@@ -0,0 +1,105 @@
+"""
+Compact container records built from the /containers/json payload
+"""
+
+
+class ContainerSummary():
+    """
+    Lightweight view of a container as returned by the list endpoint.
+    Unlike docker.models.containers.Container it never triggers an inspect.
+    """
+
+    __slots__ = ('id', 'name', 'image', 'status', 'state_text', 'created',
+                 'labels', 'ports', 'networks', 'image_id', 'host')
+
+    def __init__(self, id, name, image, status, state_text='', created=0,
+                 labels=None, ports=None, networks=None, image_id='', host=''):
+        self.id = id
+        self.name = name
+        self.image = image
+        self.status = status
+        self.state_text = state_text
+        self.created = created
+        self.labels = labels or {}
+        self.ports = ports or ()
+        self.networks = networks or {}
+        self.image_id = image_id
+        self.host = host
+
+    @property
+    def short_id(self):
+        """ The 12 chars id shown by the docker CLI """
+        return self.id[:12]
+
+    @classmethod
+    def from_payload(cls, payload):
+        """
+        Builds a summary from a single /containers/json entry
+        Args:
+          payload (dict): The raw container entry returned by the daemon
+        """
+        names = payload.get('Names') or []
+        name = names[0].lstrip('/') if names else payload['Id'][:12]
+
+        ports = tuple(
+            (p.get('IP', ''), p.get('PublicPort'), p.get('PrivatePort'),
+             p.get('Type', 'tcp')) for p in payload.get('Ports') or [])
+
+        networks = {
+            net_name: net.get('IPAddress', '')
+            for net_name, net in ((payload.get('NetworkSettings') or {}).get(
+                'Networks') or {}).items()
+        }
+
+        return cls(id=payload['Id'],
+                   name=name,
+                   image=payload.get('Image', ''),
+                   status=payload.get('State', ''),
+                   state_text=payload.get('Status', ''),
+                   created=payload.get('Created', 0),
+                   labels=payload.get('Labels') or {},
+                   ports=ports,
+                   networks=networks,
+                   image_id=payload.get('ImageID', ''))
+
+    def to_record(self):
+        """ Compact JSON serializable form, see from_record """
+        return [self.id, self.name, self.image, self.status, self.state_text,
+                self.created, self.labels, [list(p) for p in self.ports],
+                self.networks, self.image_id]
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Builds a summary from the output of to_record
+        Args:
+          record (list): The serialized summary
+        """
+        (id, name, image, status, state_text, created, labels, ports,
+         networks, image_id) = record
+        return cls(id=id,
+                   name=name,
+                   image=image,
+                   status=status,
+                   state_text=state_text,
+                   created=created,
+                   labels=labels,
+                   ports=tuple(tuple(p) for p in ports),
+                   networks=networks,
+                   image_id=image_id)
+
+    def __repr__(self):
+        return '<ContainerSummary: %s %s>' % (self.short_id, self.name)
+
+
+def list_summaries(docker_client, **kwargs):
+    """
+    Lists containers without inspecting each one of them
+    Args:
+      docker_client (docker.DockerClient): The client to query
+      kwargs: Forwarded to the low level APIClient.containers call
+    """
+    return [
+        ContainerSummary.from_payload(payload)
+        for payload in docker_client.api.containers(**kwargs)
+    ]
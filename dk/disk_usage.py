@@ -0,0 +1,120 @@
+"""
+Reclaimable disk space and API based pruning
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_CONTAINERS = 'containers'
+CATEGORY_IMAGES = 'images'
+CATEGORY_NETWORKS = 'networks'
+CATEGORY_VOLUMES = 'volumes'
+CATEGORY_BUILD_CACHE = 'build_cache'
+
+CATEGORY_LABELS = {
+    CATEGORY_CONTAINERS: 'Stopped containers',
+    CATEGORY_IMAGES: 'Unused images',
+    CATEGORY_NETWORKS: 'Unused networks',
+    CATEGORY_VOLUMES: 'Unused volumes',
+    CATEGORY_BUILD_CACHE: 'Build cache',
+}
+
+# What "docker system prune -a" removes. Volumes hold data and are opt-in
+SYSTEM_PRUNE = (CATEGORY_CONTAINERS, CATEGORY_IMAGES, CATEGORY_NETWORKS,
+                CATEGORY_BUILD_CACHE)
+
+
+def format_bytes(size):
+    """ Formats a byte count the way the docker CLI does (1.5GB, 20MB...) """
+    size = float(size or 0)
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if size < 1000:
+            return ('%d%s' if unit == 'B' else '%.1f%s') % (size, unit)
+        size /= 1000
+    return '%.1fTB' % size
+
+
+class DiskUsage():
+    """ Per category used and reclaimable bytes from a /system/df payload """
+
+    __slots__ = ('reclaimable', 'counts', 'sizes')
+
+    def __init__(self, reclaimable, counts, sizes=None):
+        self.reclaimable = reclaimable
+        self.counts = counts
+        self.sizes = sizes or {}
+
+    @classmethod
+    def from_df(cls, df):
+        """
+        Args:
+          df (dict): The payload returned by docker_client.df()
+        """
+        reclaimable = dict.fromkeys(CATEGORY_LABELS, 0)
+        counts = dict.fromkeys(CATEGORY_LABELS, 0)
+        sizes = dict.fromkeys(CATEGORY_LABELS, 0)
+        sizes[CATEGORY_IMAGES] = df.get('LayersSize') or 0
+
+        for container in df.get('Containers') or []:
+            sizes[CATEGORY_CONTAINERS] += container.get('SizeRw') or 0
+            if container.get('State') != 'running':
+                reclaimable[CATEGORY_CONTAINERS] += container.get('SizeRw') or 0
+                counts[CATEGORY_CONTAINERS] += 1
+
+        for image in df.get('Images') or []:
+            if not image.get('Containers'):
+                size = (image.get('Size') or 0) - max(image.get('SharedSize') or 0, 0)
+                reclaimable[CATEGORY_IMAGES] += max(size, 0)
+                counts[CATEGORY_IMAGES] += 1
+
+        for volume in df.get('Volumes') or []:
+            usage = volume.get('UsageData') or {}
+            sizes[CATEGORY_VOLUMES] += max(usage.get('Size') or 0, 0)
+            if usage.get('RefCount') == 0:
+                reclaimable[CATEGORY_VOLUMES] += max(usage.get('Size') or 0, 0)
+                counts[CATEGORY_VOLUMES] += 1
+
+        for entry in df.get('BuildCache') or []:
+            sizes[CATEGORY_BUILD_CACHE] += entry.get('Size') or 0
+            if not entry.get('InUse') and not entry.get('Shared'):
+                reclaimable[CATEGORY_BUILD_CACHE] += entry.get('Size') or 0
+                counts[CATEGORY_BUILD_CACHE] += 1
+
+        return cls(reclaimable, counts, sizes)
+
+    def total(self, categories=SYSTEM_PRUNE):
+        """ Reclaimable bytes over the given categories """
+        return sum(self.reclaimable.get(c, 0) for c in categories)
+
+
+def prune(docker_client, categories):
+    """
+    Prunes the given categories through the Engine API
+    Args:
+      docker_client (docker.DockerClient): The client to use
+      categories (iterable): CATEGORY_* constants
+    Returns:
+      tuple: (bytes reclaimed, list of failed categories)
+    """
+    api = docker_client.api
+    calls = {
+        CATEGORY_CONTAINERS: api.prune_containers,
+        # dangling=false removes every unused image, like "prune -a"
+        CATEGORY_IMAGES: lambda: api.prune_images(filters={'dangling': False}),
+        CATEGORY_NETWORKS: api.prune_networks,
+        CATEGORY_VOLUMES: api.prune_volumes,
+        CATEGORY_BUILD_CACHE: lambda: api.prune_builds(all=True),
+    }
+
+    reclaimed = 0
+    failed = []
+    # Containers first so their images and networks become unused
+    for category in sorted(categories, key=list(calls).index):
+        try:
+            result = calls[category]() or {}
+            reclaimed += result.get('SpaceReclaimed') or 0
+        except Exception as e:
+            logger.error("Failed to prune %s: %s", category, e)
+            failed.append(category)
+    return reclaimed, failed
@@ -0,0 +1,225 @@
+"""
+Offline prefix index of the Docker CLI reference, for dk:docs suggestions
+"""
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left
+
+from dk.paths import cache_path, write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Bundled snapshot of the CLI reference, see the file header for its format
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'docker_cli.txt')
+
+REFERENCE_URL = 'https://docs.docker.com/reference/cli/docker/'
+
+# Bumped whenever the layout of the cached index changes
+FORMAT_VERSION = 1
+
+INDEX_FILE = 'docs-index.json'
+
+# Keys looked at past the first match, bounds the cost of one letter queries
+MAX_SCAN = 400
+
+
+class DocEntry():
+    """ A command or a flag of the CLI reference """
+
+    __slots__ = ('path', 'flag', 'short', 'summary')
+
+    def __init__(self, path, flag, short, summary):
+        self.path = path
+        self.flag = flag
+        self.short = short
+        self.summary = summary
+
+    @property
+    def title(self):
+        """ "docker container run" or "docker container run -p, --publish" """
+        title = 'docker %s' % self.path
+        if self.flag:
+            flags = '%s, %s' % (self.short, self.flag) if self.short else self.flag
+            title = '%s %s' % (title, flags)
+        return title
+
+    @property
+    def url(self):
+        """ The reference page, anchored on the flag """
+        url = '%s%s/' % (REFERENCE_URL, self.path.replace(' ', '/'))
+        if self.flag:
+            url += '#' + self.flag.lstrip('-')
+        return url
+
+    def to_record(self):
+        """ Compact JSON serializable form """
+        return [self.path, self.flag, self.short, self.summary]
+
+
+def parse_reference(text):
+    """
+    Parses the reference snapshot
+    Returns:
+      list: (DocEntry, aliases) pairs, the aliases of flags are empty
+    """
+    entries = []
+    command = None
+    for line in text.splitlines():
+        if not line.strip() or line.startswith('#'):
+            continue
+        fields = [field.strip() for field in line.split('|')]
+        if not line[0].isspace():
+            path, summary = fields[0], fields[1]
+            aliases = [a.strip() for a in fields[2].split(',')] if len(fields) > 2 else []
+            command = path
+            entries.append((DocEntry(path, '', '', summary), [a for a in aliases if a]))
+            continue
+        if command is None:
+            raise ValueError('Flag outside of a command: %s' % line.strip())
+        names = fields[0].split()
+        short = names[0] if len(names) > 1 else ''
+        entries.append((DocEntry(command, names[-1], short, fields[1]), []))
+    return entries
+
+
+def build_keys(entries):
+    """
+    Returns the sorted search keys and the matching entry positions. A
+    command is found by its path, every path suffix ("run" for
+    "container run") and its aliases; a flag by any of those followed by
+    the flag, and by its bare name ("publish").
+    """
+    pairs = set()
+    command_keys = {}
+    for position, (entry, aliases) in enumerate(entries):
+        if entry.flag:
+            name = entry.flag.lstrip('-')
+            pairs.add((name, position))
+            for base in command_keys.get(entry.path, ()):
+                pairs.add(('%s %s' % (base, entry.flag), position))
+                pairs.add(('%s %s' % (base, name), position))
+                if entry.short:
+                    pairs.add(('%s %s' % (base, entry.short.lower()), position))
+            continue
+
+        words = entry.path.split()
+        keys = {' '.join(words[i:]) for i in range(len(words))}
+        keys.update(alias.lower() for alias in aliases)
+        command_keys[entry.path] = keys
+        pairs.update((key, position) for key in keys)
+
+    pairs = sorted(pairs)
+    return [key for key, _ in pairs], [position for _, position in pairs]
+
+
+class DocsIndex():
+    """
+    Sorted array of the reference keys, searched by binary search. Built
+    from the bundled snapshot once, then loaded from the XDG cache directory
+    on the first dk:docs query of a session.
+    """
+
+    def __init__(self, reference=REFERENCE_FILE):
+        """
+        Args:
+          reference (str): Path of the reference snapshot
+        """
+        self.reference = reference
+        self._lock = threading.Lock()
+        self._entries = None
+        self._keys = None
+        self._positions = None
+
+    def search(self, query, limit=8):
+        """
+        Returns the DocEntry records whose keys start with the query:
+        commands before flags, then exact matches and shorter keys first
+        Args:
+          query (str): "run", "docker run -p", "compose up --wait", "publish"
+          limit (int): Maximum number of entries returned
+        """
+        self._load()
+        needle = ' '.join((query or '').lower().split())
+        if needle.startswith('docker '):
+            needle = needle[len('docker '):]
+        if not needle or needle == 'docker':
+            return []
+
+        keys = self._keys
+        best = {}
+        start = bisect_left(keys, needle)
+        for i in range(start, min(start + MAX_SCAN, len(keys))):
+            key = keys[i]
+            if not key.startswith(needle):
+                break
+            position = self._positions[i]
+            rank = (bool(self._entries[position].flag), key != needle, len(key), position)
+            if position not in best or rank < best[position]:
+                best[position] = rank
+        ranked = sorted(best, key=best.get)[:limit]
+        return [self._entries[position] for position in ranked]
+
+    def _load(self):
+        """ Loads the cached index, building it when missing or outdated """
+        if self._keys is not None:
+            return
+        with self._lock:
+            if self._keys is not None:
+                return
+            try:
+                stat = os.stat(self.reference)
+                source = [stat.st_mtime, stat.st_size]
+            except OSError as e:
+                logger.error("Docker CLI reference not found: %s", e)
+                source = None
+
+            if source is None or not self._load_cache(source):
+                self._build(source)
+
+    def _load_cache(self, source):
+        try:
+            with open(cache_path(INDEX_FILE), 'rb') as cached:
+                data = json.loads(cached.read().decode('utf-8'))
+            if data.get('version') != FORMAT_VERSION or data.get('source') != source:
+                return False
+            entries = [DocEntry(*record) for record in data['entries']]
+            keys, positions = data['keys'], data['positions']
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring the cached docs index: %s", e)
+            return False
+
+        # The keys are published last, they flag the index as loaded
+        self._entries, self._positions, self._keys = entries, positions, keys
+        return True
+
+    def _build(self, source):
+        entries = []
+        if source is not None:
+            try:
+                with open(self.reference, 'rb') as reference:
+                    entries = parse_reference(reference.read().decode('utf-8'))
+            except (OSError, ValueError, IndexError) as e:
+                logger.error("Failed to parse the Docker CLI reference: %s", e)
+        keys, positions = build_keys(entries)
+        self._entries = [entry for entry, _ in entries]
+        self._positions, self._keys = positions, keys
+        if not entries:
+            return
+
+        data = {
+            'version': FORMAT_VERSION,
+            'source': source,
+            'entries': [entry.to_record() for entry in self._entries],
+            'keys': keys,
+            'positions': positions,
+        }
+        try:
+            write_atomic(cache_path(INDEX_FILE),
+                         json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        except OSError as e:
+            logger.warning("Failed to save the docs index: %s", e)
@@ -4,27 +4,39 @@ Manage your Docker containers from Ulauncher
 """
 
 import logging
-import gi
-import docker
-import subprocess
-from gi.repository import Notify
 from ulauncher.api.client.Extension import Extension
-from ulauncher.api.shared.event import KeywordQueryEvent, ItemEnterEvent
-from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
-from ulauncher.api.shared.action.OpenUrlAction import OpenUrlAction
-from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
-from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
+from ulauncher.api.shared.event import KeywordQueryEvent, ItemEnterEvent, PreferencesEvent, PreferencesUpdateEvent
 
+from dk.bulk import BulkOperation
+from dk.container_summary import list_summaries
+from dk.disk_usage import CATEGORY_LABELS, format_bytes, prune as prune_categories
+from dk.frecency import FrecencyStore
+from dk.hosts import DockerHosts, parse_endpoints
+from dk.jobs import JobExecutor, container_job_key
+from dk.metrics import DUMP_INTERVAL, metrics
+from dk.scheduler import QueryScheduler
 from dk.listeners.query_listener import KeywordQueryEventListener
 from dk.listeners.item_enter_listener import ItemEnterEventListener
+from dk.listeners.preferences_listener import PreferencesEventListener, PreferencesUpdateEventListener
 from dk.views.container_details import ContainerDetailsView
+from dk.views.docs import DocsView
+from dk.views.images import ImagesView
 from dk.views.info import InfoView
 from dk.views.list_containers import ListContainersView
-
-gi.require_version('Notify', '0.7')
+from dk.views.logs import LogsView
+from dk.views.projects import ProjectsView
+from dk.views.prune import PruneView
+from dk.views.stats import StatsView
+from dk.views.top import TopView
 
 logger = logging.getLogger(__name__)
 
+# Seconds the daemon waits for a container to exit before killing it
+STOP_GRACE_PERIOD = 10
+
+# Seconds after which a background container action is reported as timed out
+ACTION_TIMEOUT = STOP_GRACE_PERIOD + 20
+
 
 class DockerExtension(Extension):
     """ Extension entry point """
@@ -33,30 +45,104 @@ class DockerExtension(Extension):
         """ Initializes the extension """
         super(DockerExtension, self).__init__()
         
-        # SECURE: Initialize with error handling for Docker not running
-        try:
-            self.docker_client = docker.from_env()
-            self.docker_client.ping()  # Verify connection
-            self.docker_available = True
-        except Exception as e:
-            # Graceful fallback - don't crash if Docker is unavailable
-            logger.warning("Docker Daemon not available: %s", e)
-            self.docker_client = None
-            self.docker_available = False
-        
+        # PERFORMANCE: Daemon endpoints connect lazily on the first query and
+        # reconnect in the background, so a missing daemon never blocks startup.
+        # Each one keeps an event-driven index so queries never hit the daemon
+        self._hosts = None
+
+        # PERFORMANCE: Run container actions off the event loop
+        self.jobs = JobExecutor(self.show_notification)
+        self.queries = QueryScheduler(self.send_response)
+
+        # Containers opened or acted on recently rank first in the list
+        self.frecency = FrecencyStore()
+
         self.subscribe(KeywordQueryEvent, KeywordQueryEventListener())
         self.subscribe(ItemEnterEvent, ItemEnterEventListener())
+        self.subscribe(PreferencesEvent, PreferencesEventListener())
+        self.subscribe(PreferencesUpdateEvent, PreferencesUpdateEventListener())
 
         self.icon_path = 'images/icon.png'
         self.list_containers_view = ListContainersView(self)
         self.container_details_view = ContainerDetailsView(self)
         self.info_view = InfoView(self)
+        self.prune_view = PruneView(self)
+        self.top_view = TopView(self)
+        self.stats_view = StatsView(self)
+        self.logs_view = LogsView(self)
+        self.projects_view = ProjectsView(self)
+        self.docs_view = DocsView(self)
+        self.images_view = ImagesView(self)
 
-        # SECURITY: Initialize notifications with error handling
-        try:
-            Notify.init("DockerExtension")
-        except Exception as e:
-            logger.error("Failed to initialize notifications: %s", e)
+        # Notify is loaded on the first notification, off the startup path
+        self._notify = None
+
+    @property
+    def hosts(self):
+        """ The configured Docker daemons, built on first use """
+        if self._hosts is None:
+            self._hosts = DockerHosts(
+                parse_endpoints(self.preferences.get("docker_hosts")))
+        return self._hosts
+
+    def configure_hosts(self, value):
+        """
+        Replaces the daemon endpoints after a preference change
+        Args:
+          value (str): The docker_hosts preference value
+        """
+        if self._hosts is not None:
+            self._hosts.close()
+        self._hosts = DockerHosts(parse_endpoints(value))
+
+    def configure_metrics(self, value):
+        """
+        Turns the hot path instrumentation on or off
+        Args:
+          value (str): The diagnostics preference value: "off", "on" or
+            "dump" to also write the metrics periodically
+        """
+        metrics.configure(value in ("on", "dump"),
+                          dump_interval=DUMP_INTERVAL if value == "dump" else 0)
+
+    @property
+    def connection(self):
+        """ The connection to the primary daemon """
+        return self.hosts.primary.connection
+
+    @property
+    def docker_available(self):
+        """ Whether the primary Docker daemon is reachable """
+        return self.hosts.primary.available
+
+    @property
+    def docker_client(self):
+        """ The docker client of the primary daemon """
+        return self.hosts.primary.client
+
+    def send_response(self, event, action):
+        """
+        Sends the result of an event rendered in the background
+        Args:
+          event (BaseEvent): The event being answered
+          action (BaseAction): The action to run, usually a result list
+        """
+        from ulauncher.api.shared.Response import Response
+        self._client.send(Response(event, action))
+
+    def _notifications(self):
+        """ Returns the Notify module, initializing it on first use """
+        if self._notify is None:
+            # SECURITY: Initialize notifications with error handling
+            try:
+                import gi
+                gi.require_version('Notify', '0.7')
+                from gi.repository import Notify
+                Notify.init("DockerExtension")
+                self._notify = Notify
+            except Exception as e:
+                logger.error("Failed to initialize notifications: %s", e)
+        return self._notify
 
     def show_notification(self, text):
         """
@@ -77,7 +163,7 @@ class DockerExtension(Extension):
         safe_text = escape(text)
         
         try:
-            Notify.Notification.new("Docker", safe_text).show()
+            self._notifications().Notification.new("Docker", safe_text).show()
         except Exception as e:
             logger.error("Failed to show notification: %s", e)
 
@@ -85,19 +171,53 @@ class DockerExtension(Extension):
         """ Shows Docker daemon information"""
         return self.info_view.render()
 
+    def show_top(self, query):
+        """ Lists running containers by resource usage """
+        return self.top_view.render(query)
+
+    def show_logs(self, query):
+        """ Shows the last log lines of a container """
+        return self.logs_view.render(query)
+
+    def show_stats(self, query):
+        """ Shows the recorded latencies and cache hit rates """
+        return self.stats_view.render(query)
+
     def list_containers(self, query):
-        """ Lists running containers"""
+        """
+        Lists containers, running ones unless the query filters on status
+        Args:
+          query (str|ContainerQuery): Free text and structured filters
+        """
         return self.list_containers_view.render(query)
 
-    def show_container_details(self, container_id):
+    def show_projects(self, query):
+        """ Lists the compose projects """
+        return self.projects_view.render(query)
+
+    def show_project(self, project, host=None):
+        """ Shows the containers and actions of a compose project """
+        return self.projects_view.render_project(project, host)
+
+    def show_images(self, query):
+        """ Lists the images by size or age """
+        return self.images_view.render(query)
+
+    def show_image(self, image_id, host=None):
+        """ Shows the actions of an image """
+        return self.images_view.render_image(image_id, host)
+
+    def show_container_details(self, container_id, host=None):
         """ Show the details of the container with the specified id"""
-        return self.container_details_view.render(container_id)
+        self._remember(container_id, host)
+        return self.container_details_view.render(container_id, host)
 
-    def start_container(self, container_id):
+    def start_container(self, container_id, host=None):
         """
-        Starts the container with the specified id
+        Starts the container with the specified id in the background
         Args:
           container_id (str): The container id
+          host (str): The name of the daemon running the container
         """
         # SECURITY: Validate container_id format
         import re
@@ -105,14 +225,54 @@ class DockerExtension(Extension):
             logger.error("Invalid container_id format: %s", container_id)
             self.show_notification("Invalid container ID format")
             return
-        
-        if not self.docker_available:
+
+        self._submit_action(container_id, host, "Starting container %s",
+                            self._start_container)
+
+    def stop_container(self, container_id, host=None):
+        """
+        Stops the container with the specified id in the background
+        Args:
+          container_id (str): The container id
+          host (str): The name of the daemon running the container
+        """
+        self._submit_action(container_id, host, "Stopping container %s",
+                            self._stop_container)
+
+    def restart_container(self, container_id, host=None):
+        """
+        Restarts the container with the specified id in the background
+        Args:
+          container_id (str): The container id
+          host (str): The name of the daemon running the container
+        """
+        self._submit_action(container_id, host, "Restarting container %s",
+                            self._restart_container)
+
+    def _submit_action(self, container_id, host, label, action):
+        """ Schedules a container action on the job executor """
+        docker_host = self.hosts.get(host)
+        if not docker_host.available:
             logger.error("Docker not available")
             self.show_notification("Docker daemon is not running")
             return
-        
+
+        self._remember(container_id, host)
+        self.jobs.submit(container_job_key(docker_host.name, container_id),
+                         label % container_id[:12],
+                         action,
+                         docker_host.client,
+                         container_id,
+                         timeout=ACTION_TIMEOUT)
+
+    def _remember(self, container_id, host):
+        """ Records a use of the container in the frecency store """
+        self.frecency.visit_container(self.hosts.get(host).index, container_id)
+
+    def _start_container(self, client, container_id):
+        import docker
         try:
-            self.docker_client.containers.get(container_id).start()
+            client.containers.get(container_id).start()
             self.show_notification("Container %s started successfully" %
                                    container_id[:12])
         except docker.errors.NotFound:
@@ -123,68 +283,236 @@ class DockerExtension(Extension):
             self.show_notification("Failed to start container %s" %
                                    container_id[:12])
 
-    def stop_container(self, container_id):
+    def _stop_container(self, client, container_id):
+        try:
+            client.containers.get(container_id).stop(timeout=STOP_GRACE_PERIOD)
+            self.show_notification("Container %s stopped with success" %
+                                   container_id[:12])
+        except Exception as e:
+            logger.error("Failed to stop container %s: %s", container_id, e)
+            self.show_notification("Failed to stop container %s" %
+                                   container_id[:12])
+
+    def _restart_container(self, client, container_id):
+        try:
+            client.containers.get(container_id).restart(
+                timeout=STOP_GRACE_PERIOD)
+            self.show_notification("Container %s restarted with success" %
+                                   container_id[:12])
+        except Exception as e:
+            logger.error("Failed to restart container %s: %s", container_id, e)
+            self.show_notification("Failed to restart container %s" %
+                                   container_id[:12])
+
+    def bulk_container_action(self, operation, targets):
         """
-        Stops the container with the specified id
+        Runs a lifecycle operation over several containers in the background
         Args:
-          container_id (str): The container id
+          operation (str): One of the dk.bulk OPERATION_* constants
+          targets (list): [host name, container id] pairs
         """
-        if not self.docker_available:
-            logger.error("Docker not available")
+        by_host = {}
+        for host, container_id in targets:
+            by_host.setdefault(host, []).append(container_id)
+
+        clients = {}
+        containers = []
+        for host, container_ids in by_host.items():
+            docker_host = self.hosts.get(host)
+            if not docker_host.available:
+                logger.error("Docker host %s not available", docker_host.name)
+                continue
+            clients[docker_host.name] = docker_host.client
+
+            # The summaries carry the compose labels used for dependency ordering
+            index = docker_host.index
+            if index.ready:
+                containers.extend(c for c in map(index.get, container_ids) if c)
+            else:
+                for container in list_summaries(docker_host.client,
+                                                all=True,
+                                                filters={'id': container_ids}):
+                    container.host = docker_host.name
+                    containers.append(container)
+
+        if not containers:
+            self.show_notification("No containers to %s" % operation)
+            return
+
+        bulk = BulkOperation(clients,
+                             operation,
+                             containers,
+                             grace_period=STOP_GRACE_PERIOD)
+        # Keyed on the containers: an action on one of them is refused while
+        # the bulk job runs, other containers are not held up
+        self.jobs.submit(tuple(sorted(container_job_key(c.host, c.id) for c in containers)),
+                         "Bulk %s of %d containers" % (operation, len(containers)),
+                         self._run_bulk,
+                         bulk)
+
+    def project_action(self, operation, project, host=None):
+        """
+        Runs a lifecycle operation over every container of a compose project
+        in the background. Projects run in parallel, each one bounded by the
+        bulk operation concurrency.
+        Args:
+          operation (str): One of the dk.bulk OPERATION_* constants
+          project (str): The compose project name
+          host (str): The name of the daemon running the project
+        """
+        docker_host = self.hosts.get(host)
+        if not docker_host.available:
+            self.show_notification("Docker daemon is not running")
+            return
+
+        group = docker_host.projects.get(project)
+        if group is None:
+            self.show_notification("Compose project %s not found" % project)
+            return
+
+        bulk = BulkOperation({docker_host.name: docker_host.client},
+                             operation,
+                             group.containers,
+                             grace_period=STOP_GRACE_PERIOD)
+        self.jobs.submit(tuple(sorted(container_job_key(docker_host.name, c.id)
+                                      for c in group.containers)),
+                         "Project %s %s" % (project, operation),
+                         self._run_bulk,
+                         bulk)
+
+    def _run_bulk(self, bulk):
+        self.show_notification(bulk.summary(*bulk.run()))
+
+    def remove_image(self, reference, host=None):
+        """
+        Removes an image tag in the background, the image itself goes with
+        its last tag
+        Args:
+          reference (str): A tag ("postgres:16") or the full id of an
+            untagged image
+          host (str): The name of the daemon holding the image
+        """
+        # SECURITY: Only accept image references and ids
+        import re
+        if not re.match(r'^[a-zA-Z0-9][a-zA-Z0-9._/:@-]*$', reference):
+            logger.error("Invalid image reference: %s", reference)
+            self.show_notification("Invalid image reference")
+            return
+
+        docker_host = self.hosts.get(host)
+        if not docker_host.available:
             self.show_notification("Docker daemon is not running")
             return
 
+        label = self._image_label(reference)
+        self.jobs.submit("image:%s/%s" % (docker_host.name, label),
+                         "Removing image %s" % label,
+                         self._remove_image,
+                         docker_host,
+                         reference,
+                         timeout=ACTION_TIMEOUT)
+
+    def _image_label(self, reference):
+        """ The short id of an image id, the reference itself otherwise """
+        if reference.startswith('sha256:'):
+            return reference.split(':', 1)[1][:12]
+        return reference
+
+    def _remove_image(self, host, reference):
+        import docker
+        label = self._image_label(reference)
         try:
-            self.docker_client.containers.get(container_id).stop()
-            self.show_notification("Container %s stopped with success" %
-                                   container_id)
+            # No force: the daemon knows better than our index whether a
+            # container still uses the image
+            host.client.api.remove_image(reference)
+            self.show_notification("Image %s removed" % label)
+        except docker.errors.APIError as e:
+            logger.error("Failed to remove image %s: %s", reference, e)
+            if e.status_code == 409:
+                # Conflict: in use by a container, or referenced elsewhere
+                self.show_notification("Cannot remove image %s: %s" % (label, e.explanation))
+            else:
+                self.show_notification("Failed to remove image %s" % label)
         except Exception as e:
-            logger.error("Failed to stop container %s: %s", container_id, e)
-            self.show_notification("Failed to stop container %s" %
-                                   container_id)
+            logger.error("Failed to remove image %s: %s", reference, e)
+            self.show_notification("Failed to remove image %s" % label)
+        finally:
+            self._images_changed(host)
 
-    def restart_container(self, container_id):
+    def pull_image(self, reference, host=None):
         """
-        Restarts the container with the specified id
+        Pulls the latest version of an image tag in the background
         Args:
-          container_id (str): The container id
+          reference (str): The image reference, "postgres:16"
+          host (str): The name of the daemon to pull on
         """
-        if not self.docker_available:
-            logger.error("Docker not available")
+        # SECURITY: Only accept image references
+        import re
+        if not re.match(r'^[a-zA-Z0-9][a-zA-Z0-9._/:@-]*$', reference):
+            logger.error("Invalid image reference: %s", reference)
+            self.show_notification("Invalid image reference")
+            return
+
+        docker_host = self.hosts.get(host)
+        if not docker_host.available:
             self.show_notification("Docker daemon is not running")
             return
 
+        # No timeout: large images take as long as the registry needs
+        self.jobs.submit("pull:%s/%s" % (docker_host.name, reference),
+                         "Pulling %s" % reference,
+                         self._pull_image,
+                         docker_host,
+                         reference)
+
+    def _pull_image(self, host, reference):
+        from docker.utils import parse_repository_tag
+        repository, tag = parse_repository_tag(reference)
         try:
-            self.docker_client.containers.get(container_id).restart()
-            self.show_notification("Container %s restarted with success" %
-                                   container_id)
+            host.client.images.pull(repository, tag=tag or 'latest')
+            self.show_notification("Image %s pulled" % reference)
         except Exception as e:
-            logger.error("Failed to restart container %s: %s", container_id, e)
-            self.show_notification("Failed to restart container %s" %
-                                   container_id)
+            logger.error("Failed to pull image %s: %s", reference, e)
+            self.show_notification("Failed to pull image %s" % reference)
+        finally:
+            self._images_changed(host)
+
+    def _images_changed(self, host):
+        """ Refreshes the image list and the disk usage after a change """
+        host.images.invalidate()
+        host.images.refresh()
+        host.disk_usage.invalidate()
 
     def prune(self):
-        """ Run docker system prune command"""
-        try:
-            output = subprocess.run(
-                ["docker", "system", "prune", "-a", "-f"],
-                check=True,
-                capture_output=True,
-                text=True,
-            )
-            self.show_notification("Prune completed successfully: %s" %
-                                   output.stdout)
-            return HideWindowAction()
-        except Exception as e:
-            self.show_notification("Prune command failed with error: %s" % e)
+        """ Shows the reclaimable space before pruning """
+        return self.prune_view.render()
+
+    def run_prune(self, categories):
+        """
+        Prunes unused Docker data in the background
+        Args:
+          categories (list): dk.disk_usage CATEGORY_* constants to prune
+        """
+        # SECURITY: Only accept known prune categories
+        categories = [c for c in categories if c in CATEGORY_LABELS]
+        host = self.hosts.primary
+        if not categories:
+            return
+        if not host.available:
+            self.show_notification("Docker daemon is not running")
+            return
+
+        self.jobs.submit("prune", "Prune", self._run_prune, host, categories)
+
+    def _run_prune(self, host, categories):
+        reclaimed, failed = prune_categories(host.client, categories)
+        host.disk_usage.invalidate()
+        host.images.invalidate()
+        text = "Prune completed: %s freed" % format_bytes(reclaimed)
+        if failed:
+            text += " (failed: %s)" % ', '.join(failed)
+        self.show_notification(text)
 
     def search_documentation(self, query):
-        """ Searches on https://docs.docker.com """
-        return RenderResultListAction([
-            ExtensionResultItem(
-                icon=self.icon_path,
-                name="Press enter to search for %s" % query,
-                highlightable=False,
-                on_enter=OpenUrlAction("https://docs.docker.com/search/?q=%s" %
-                                       str(query)))
-        ])
+        """ Suggests Docker CLI reference pages, or searches on https://docs.docker.com """
+        return self.docs_view.render(query)
@@ -0,0 +1,150 @@
+"""
+Frequency and recency of the containers the user works with
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+
+from dk.paths import cache_path, write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Days after which a visit counts half as much
+HALF_LIFE_DAYS = 3
+
+# Names remembered, the least used ones are forgotten first
+MAX_ENTRIES = 200
+
+# Upper bound of the ranking boost, below an exact name match (10) so a
+# frequently used container never hides the one the user is typing
+MAX_BOOST = 4.0
+
+# Seconds of quiet after a visit before the store is saved
+SAVE_DELAY = 5
+
+STORE_FILE = 'frecency.json'
+
+
+class FrecencyStore():
+    """
+    Exponentially decayed visit counts keyed by container name, so the
+    history survives a container being recreated. Each entry is a
+    (score, time) pair: updates decay the score to now and add the visit,
+    O(1) without ever rescanning the history.
+    """
+
+    def __init__(self, filename=STORE_FILE, half_life_days=HALF_LIFE_DAYS,
+                 max_entries=MAX_ENTRIES):
+        self.filename = filename
+        self.decay_rate = math.log(2) / (half_life_days * 86400)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = None
+        self._save_timer = None
+
+    def visit(self, name, weight=1.0):
+        """
+        Records a use of a container
+        Args:
+          name (str): The container name
+          weight (float): How much the visit counts
+        """
+        now = time.time()
+        key = name.lower()
+        with self._lock:
+            entries = self._load()
+            score, updated_at = entries.get(key, (0.0, now))
+            entries[key] = (self._decay(score, now - updated_at) + weight, now)
+            if len(entries) > self.max_entries:
+                self._evict(entries, now)
+        self._schedule_save()
+
+    def visit_container(self, index, container_id):
+        """
+        Records a use of an indexed container
+        Args:
+          index (ContainerIndex): The index of the container host
+          container_id (str): The full id, or the 12 chars short id some
+            actions carry
+        Returns:
+          bool: False when the container is not indexed
+        """
+        container = index.resolve(container_id)
+        if container is None:
+            return False
+        self.visit(container.name)
+        return True
+
+    def score(self, name):
+        """ The decayed score of a container name """
+        with self._lock:
+            entry = self._load().get(name.lower())
+        if entry is None:
+            return 0.0
+        return self._decay(entry[0], time.time() - entry[1])
+
+    def booster(self):
+        """
+        Returns a function mapping a lowercase container name to its ranking
+        boost, between 0 and MAX_BOOST. Built once per query.
+        """
+        now = time.time()
+        with self._lock:
+            entries = dict(self._load())
+        if not entries:
+            return None
+
+        def boost(name):
+            entry = entries.get(name)
+            if entry is None:
+                return 0.0
+            score = self._decay(entry[0], now - entry[1])
+            return MAX_BOOST * score / (score + 1.0)
+        return boost
+
+    def _decay(self, score, elapsed):
+        return score * math.exp(-self.decay_rate * max(elapsed, 0))
+
+    def _evict(self, entries, now):
+        """ Forgets the lowest scores, keeping 90% of the capacity """
+        ranked = sorted(entries.items(),
+                        key=lambda e: self._decay(e[1][0], now - e[1][1]))
+        for key, _ in ranked[:len(entries) - int(self.max_entries * 0.9)]:
+            del entries[key]
+
+    def _load(self):
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        try:
+            with open(cache_path(self.filename), 'rb') as store:
+                data = json.loads(store.read().decode('utf-8'))
+            for key, (score, updated_at) in data.get('entries', {}).items():
+                self._entries[key] = (float(score), float(updated_at))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring the frecency store: %s", e)
+        return self._entries
+
+    def _schedule_save(self):
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SAVE_DELAY, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """ Writes the store to the cache directory """
+        with self._lock:
+            self._save_timer = None
+            data = {'entries': {k: list(v) for k, v in self._load().items()}}
+        try:
+            write_atomic(cache_path(self.filename),
+                         json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        except OSError as e:
+            logger.warning("Failed to save the frecency store: %s", e)
@@ -0,0 +1,357 @@
+"""
+Docker daemon endpoints queried concurrently
+"""
+
+import logging
+import re
+import shlex
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from dk.connection import DockerConnection, STATE_CONNECTED
+from dk.container_index import ContainerIndex, ContainerWatcher
+from dk.container_summary import list_summaries
+from dk.disk_usage import DiskUsage
+from dk.images import ImageUsage, list_images
+from dk.index_store import IndexStore
+from dk.inspect_cache import InspectCache
+from dk.logs import LogBuffers
+from dk.metrics import metrics
+from dk.projects import ComposeProjects
+from dk.query import parse_query
+from dk.resource_stats import StatsSampler
+from dk.snapshot import CachedSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Name of the endpoint resolved from the environment (DOCKER_HOST or the local socket)
+LOCAL_HOST = 'local'
+
+# Seconds a query waits for a host whose index is not ready
+QUERY_TIMEOUT = 1.5
+
+# Seconds between two checks that a waiting query was not superseded
+CANCEL_POLL_INTERVAL = 0.05
+
+# Seconds a fallback list is reused by the next queries while the index syncs
+FALLBACK_TTL = 2
+
+# Seconds of quiet after an index change before the snapshot is saved
+SAVE_DELAY = 5
+
+
+def parse_endpoints(value):
+    """
+    Parses the docker_hosts preference. Entries are separated by commas or
+    new lines and are daemon URLs or docker context names. The local
+    environment endpoint is always queried first.
+    """
+    endpoints = [None]
+    for entry in re.split(r'[,\n]', value or ""):
+        entry = entry.strip()
+        if entry and entry not in (LOCAL_HOST, 'default') and entry not in endpoints:
+            endpoints.append(entry)
+    return endpoints
+
+
+class DockerHost():
+    """ A single daemon endpoint with its own connection, index and caches """
+
+    def __init__(self, endpoint=None, name=None):
+        """
+        Args:
+          endpoint (str): A daemon URL or context name, None for the local
+            environment
+          name (str): Label shown next to the host containers
+        """
+        self.endpoint = endpoint
+        self.name = name or self.display_name(endpoint)
+        self.connection = DockerConnection(on_connect=self._on_connect,
+                                           endpoint=endpoint)
+        self.index = ContainerIndex(host=self.name)
+        self.projects = ComposeProjects(self.index)
+        self.image_usage = ImageUsage(self.index)
+        self.watcher = None
+        self.inspect_cache = None
+        self.disk_usage = None
+        self.images = None
+        self.system_info = None
+        self.stats_sampler = None
+        self.logs = None
+        # (monotonic time, ContainerIndex) of the last fallback list
+        self._fallback = None
+        self.store = IndexStore(self.name)
+        self._snapshot = None
+        self._snapshot_loaded = False
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+
+    @staticmethod
+    def display_name(endpoint):
+        """ Short label of an endpoint """
+        if not endpoint:
+            return LOCAL_HOST
+        # Drop the scheme and the port: "tcp://build1:2376" -> "build1"
+        name = endpoint.split('://', 1)[-1]
+        name = name.rsplit('@', 1)[-1]
+        if not name.startswith('/'):
+            name = name.split(':', 1)[0]
+        return name
+
+    @property
+    def available(self):
+        """ Whether the daemon is reachable, connecting lazily """
+        return self.connection.available
+
+    @property
+    def client(self):
+        """ The docker client of the current connection """
+        return self.connection.client
+
+    @property
+    def cli_prefix(self):
+        """ The docker CLI invocation that targets this host, shell quoted """
+        if not self.endpoint:
+            return "docker"
+        flag = "-H" if "://" in self.endpoint else "--context"
+        return "docker %s %s" % (flag, shlex.quote(self.endpoint))
+
+    @property
+    def cached(self):
+        """
+        Whether queries are answered from the snapshot saved by a previous
+        session, while the index syncs with the daemon
+        """
+        if self.index.ready:
+            self._snapshot = None
+            return False
+        if not self._snapshot_loaded:
+            self._snapshot_loaded = True
+            containers = self.store.load()
+            if containers is not None:
+                snapshot = ContainerIndex(host=self.name)
+                snapshot.replace(containers)
+                self._snapshot = snapshot
+        return self._snapshot is not None
+
+    def search(self, query, only_running=True, limit=8, boost=None):
+        """
+        Ranks the host containers. Served from memory once the index is
+        synced, from the last session snapshot until then, otherwise from a
+        list call shared by the queries typed within FALLBACK_TTL.
+        Args:
+          boost (callable): Optional score bonus by lowercase container name
+        Returns:
+          list: (score, ContainerSummary) tuples
+        """
+        query = parse_query(query)
+        if self.cached:
+            # PERFORMANCE: Render right away, the daemon catches up behind
+            self.connection.connect_in_background()
+            only_running = only_running and not query.has_status
+            return self._snapshot.search(query, only_running=only_running,
+                                         limit=limit, with_scores=True,
+                                         boost=boost)
+
+        if not self.available:
+            return []
+
+        only_running = only_running and not query.has_status
+        index = self.index
+        metrics.cache('index', index.ready)
+        if not index.ready:
+            index = self._fallback_index()
+            if index is None:
+                return []
+
+        return index.search(query, only_running=only_running, limit=limit,
+                            with_scores=True, boost=boost)
+
+    def _fallback_index(self):
+        """ A temporary index from a single list call, None on failure """
+        fallback = self._fallback
+        if fallback is not None and time.monotonic() - fallback[0] < FALLBACK_TTL:
+            return fallback[1]
+
+        try:
+            summaries = list_summaries(self.client, all=True)
+        except Exception as e:
+            self.connection.report_error(e)
+            return None
+        index = ContainerIndex(host=self.name)
+        index.replace(summaries)
+        self._fallback = (time.monotonic(), index)
+        return index
+
+    def close(self):
+        """ Stops the watcher, the reconnections and the per-host workers """
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.connection.close()
+        for worker in (self.inspect_cache, self.stats_sampler, self.logs):
+            if worker is not None:
+                worker.close()
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+
+    def _schedule_save(self, container_id=None):
+        """ Saves the index snapshot once changes settle down """
+        with self._save_lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SAVE_DELAY, self._save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save(self):
+        with self._save_lock:
+            self._save_timer = None
+        if self.index.ready:
+            self.store.save(self.index.all())
+
+    def _on_connect(self, client):
+        """ Starts the daemon backed subsystems once a client is available """
+        if self.watcher is not None:
+            return
+
+        self.inspect_cache = InspectCache(client)
+        # df() walks every layer and volume, never call it on the query path
+        self.disk_usage = CachedSnapshot('df',
+                                         lambda: DiskUsage.from_df(client.df()),
+                                         ttl=300)
+        # Refreshed in the background, dk:images only reads and sorts the list
+        self.images = CachedSnapshot('images',
+                                     lambda: list_images(client, self.name),
+                                     ttl=120)
+        self.system_info = CachedSnapshot('info', client.info, ttl=30)
+        self.system_info.refresh()
+        self.stats_sampler = StatsSampler(client, self.index)
+        self.logs = LogBuffers(client, self.index)
+        self.index.subscribe(self.inspect_cache.invalidate)
+        self.index.subscribe(self._schedule_save)
+        self.watcher = ContainerWatcher(client,
+                                        self.index,
+                                        on_error=self.connection.report_error)
+        self.watcher.start()
+
+
+class DockerHosts():
+    """
+    The set of configured daemon endpoints. Queries fan out to every host
+    concurrently and the ranked results are merged, so a slow or dead host
+    only costs QUERY_TIMEOUT and never blocks the others.
+    """
+
+    def __init__(self, endpoints=None):
+        self.hosts = []
+        names = set()
+        for endpoint in endpoints or [None]:
+            name = DockerHost.display_name(endpoint)
+            if name in names:
+                name = '%s#%d' % (name, len(self.hosts))
+            names.add(name)
+            self.hosts.append(DockerHost(endpoint, name=name))
+        self._pool = ThreadPoolExecutor(max_workers=max(2, len(self.hosts)),
+                                        thread_name_prefix="dk-hosts")
+        # Host name -> query still running past its timeout
+        self._inflight = {}
+
+    def __iter__(self):
+        return iter(self.hosts)
+
+    def __len__(self):
+        return len(self.hosts)
+
+    @property
+    def primary(self):
+        """ The first configured host, the local daemon by default """
+        return self.hosts[0]
+
+    def get(self, name):
+        """ Returns the host with the given name, or the primary one """
+        for host in self.hosts:
+            if host.name == name:
+                return host
+        return self.primary
+
+    @property
+    def connected(self):
+        """ Whether at least one daemon is known to be reachable """
+        return any(host.connection.state == STATE_CONNECTED for host in self.hosts)
+
+    def search(self, query, only_running=True, limit=8, cancelled=None,
+               boost=None):
+        """
+        Ranks the containers of every host and merges the results
+        Args:
+          query (str|ContainerQuery): Free text and structured filters
+          only_running (bool): Skip containers that are not running, unless
+            the query filters on the status
+          limit (int): Maximum number of containers returned, None for all
+          cancelled (callable): Polled while waiting on slow hosts, stops
+            waiting when it returns True
+          boost (callable): Optional score bonus by lowercase container
+            name, see FrecencyStore.booster
+        """
+        query = parse_query(query)
+        results = []
+        # Future -> host whose query must be ranked again once it completes
+        pending = {}
+        for host in self.hosts:
+            if (host.connection.state == STATE_CONNECTED and host.index.ready) or host.cached:
+                # In memory: no need to pay for a thread hop
+                results.extend(host.search(query, only_running, limit, boost))
+                continue
+
+            # A slow host keeps at most one worker busy: while an older
+            # query is still listing, wait for it and rank this query
+            # against the list it fetched instead of issuing another call
+            previous = self._inflight.get(host.name)
+            if previous is not None and not previous.done():
+                pending[previous] = host
+                continue
+            future = self._pool.submit(host.search, query, only_running, limit, boost)
+            self._inflight[host.name] = future
+            pending[future] = None
+
+        if pending:
+            done, not_done = self._wait(list(pending), cancelled)
+            for future in done:
+                try:
+                    if pending[future] is None:
+                        results.extend(future.result())
+                    else:
+                        results.extend(pending[future].search(query, only_running,
+                                                              limit, boost))
+                except Exception as e:
+                    logger.error("Host query failed: %s", e)
+            if not_done and not (cancelled and cancelled()):
+                logger.warning("%d Docker host(s) timed out", len(not_done))
+
+        results.sort(key=lambda r: (-r[0], r[1].name))
+        if limit is not None:
+            results = results[:limit]
+        return [container for _, container in results]
+
+    def _wait(self, futures, cancelled):
+        """ Waits for the host queries, up to QUERY_TIMEOUT """
+        if cancelled is None:
+            return wait(futures, timeout=QUERY_TIMEOUT)
+
+        # The queries themselves keep running (and stay deduplicated by
+        # _inflight) but a superseded query stops waiting on them
+        deadline = time.monotonic() + QUERY_TIMEOUT
+        while True:
+            done, not_done = wait(futures, timeout=min(CANCEL_POLL_INTERVAL,
+                                                       max(deadline - time.monotonic(), 0)))
+            if not not_done or cancelled() or time.monotonic() >= deadline:
+                return done, not_done
+
+    def close(self):
+        """ Stops all the hosts background work """
+        for host in self.hosts:
+            host.close()
+        self._pool.shutdown(wait=False)
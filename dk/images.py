@@ -0,0 +1,143 @@
+"""
+Compact image records built from the /images/json payload
+"""
+
+import threading
+import time
+
+# Repository and tag the daemon reports for untagged images
+NONE_TAG = '<none>:<none>'
+
+
+def format_created(created, now=None):
+    """ Formats an image creation time the way the docker CLI does: "3 weeks ago" """
+    seconds = max((now or time.time()) - (created or 0), 0)
+    for unit, length in (('year', 365 * 86400), ('month', 30 * 86400),
+                         ('week', 7 * 86400), ('day', 86400), ('hour', 3600),
+                         ('minute', 60)):
+        if seconds >= length:
+            count = int(seconds // length)
+            return '%d %s%s ago' % (count, unit, '' if count == 1 else 's')
+    return 'just now'
+
+
+class ImageSummary():
+    """
+    Lightweight view of an image as returned by the list endpoint. Unlike
+    docker.models.images.Image it never triggers an inspect.
+    """
+
+    __slots__ = ('id', 'tags', 'size', 'created', 'host')
+
+    def __init__(self, id, tags=None, size=0, created=0, host=''):
+        self.id = id
+        self.tags = tags or []
+        self.size = size
+        self.created = created
+        self.host = host
+
+    @property
+    def short_id(self):
+        """ The 12 chars id shown by the docker CLI """
+        return self.id.split(':', 1)[-1][:12]
+
+    @property
+    def dangling(self):
+        """ Whether no tag references the image anymore """
+        return not self.tags
+
+    @property
+    def name(self):
+        """ The first tag, or the short id of dangling images """
+        return self.tags[0] if self.tags else '<none> %s' % self.short_id
+
+    @classmethod
+    def from_payload(cls, payload):
+        """
+        Builds a summary from a single /images/json entry
+        Args:
+          payload (dict): The raw image entry returned by the daemon
+        """
+        return cls(id=payload['Id'],
+                   tags=sorted(t for t in payload.get('RepoTags') or [] if t != NONE_TAG),
+                   size=payload.get('Size') or 0,
+                   created=payload.get('Created') or 0)
+
+    def __repr__(self):
+        return '<ImageSummary: %s %s>' % (self.short_id, self.name)
+
+
+def list_images(docker_client, host=''):
+    """
+    Lists the top level images without inspecting each one of them
+    Args:
+      docker_client (docker.DockerClient): The client to query
+      host (str): Name of the daemon, set on every record
+    """
+    images = []
+    for payload in docker_client.api.images():
+        image = ImageSummary.from_payload(payload)
+        image.host = host
+        images.append(image)
+    return images
+
+
+class ImageUsage():
+    """
+    Names of the containers using each image, updated from the index change
+    notifications so listing images never walks the containers
+    """
+
+    def __init__(self, index):
+        """
+        Args:
+          index (ContainerIndex): The containers of the host, kept in sync
+        """
+        self.index = index
+        self._lock = threading.Lock()
+        # Image id -> {container id: container name}
+        self._usage = {}
+        # Container id -> image id, to move containers between images
+        self._images = {}
+        index.subscribe(self._changed)
+        if index.ready:
+            self._rebuild()
+
+    def get(self, image_id):
+        """ Returns the sorted names of the containers using the image """
+        with self._lock:
+            return sorted(self._usage.get(image_id, {}).values())
+
+    def _changed(self, container_id):
+        if container_id is None:
+            self._rebuild()
+            return
+
+        container = self.index.get(container_id)
+        with self._lock:
+            self._discard(container_id)
+            if container is not None:
+                self._add(container)
+
+    def _rebuild(self):
+        containers = self.index.all()
+        with self._lock:
+            self._usage = {}
+            self._images = {}
+            for container in containers:
+                self._add(container)
+
+    def _add(self, container):
+        if container.image_id:
+            self._usage.setdefault(container.image_id, {})[container.id] = container.name
+            self._images[container.id] = container.image_id
+
+    def _discard(self, container_id):
+        image_id = self._images.pop(container_id, None)
+        if image_id is None:
+            return
+        containers = self._usage.get(image_id)
+        if containers is not None:
+            containers.pop(container_id, None)
+            if not containers:
+                del self._usage[image_id]
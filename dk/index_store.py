@@ -0,0 +1,71 @@
+"""
+On-disk snapshot of a container index, for an instant first render
+"""
+
+import json
+import logging
+import re
+import time
+
+from dk.container_summary import ContainerSummary
+from dk.paths import cache_path, write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the record layout of ContainerSummary.to_record changes
+FORMAT_VERSION = 2
+
+# Snapshots older than this are not worth showing
+MAX_AGE = 7 * 24 * 3600
+
+
+class IndexStore():
+    """ Saves and loads the containers of a host in the XDG cache directory """
+
+    def __init__(self, host):
+        """
+        Args:
+          host (str): Name of the host, used in the file name
+        """
+        self.host = host
+        self.filename = 'containers-%s.json' % re.sub(r'[^A-Za-z0-9_.-]', '_', host)
+        self.saved_at = None
+
+    def load(self):
+        """
+        Returns the saved ContainerSummary records, None when there is no
+        usable snapshot
+        """
+        try:
+            with open(cache_path(self.filename), 'rb') as snapshot:
+                data = json.loads(snapshot.read().decode('utf-8'))
+            if data.get('version') != FORMAT_VERSION:
+                return None
+            if time.time() - data['saved_at'] > MAX_AGE:
+                return None
+            containers = [ContainerSummary.from_record(r) for r in data['containers']]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Ignoring the %s container snapshot: %s", self.host, e)
+            return None
+
+        self.saved_at = data['saved_at']
+        return containers
+
+    def save(self, containers):
+        """
+        Atomically replaces the snapshot
+        Args:
+          containers (list): The ContainerSummary records to save
+        """
+        data = {
+            'version': FORMAT_VERSION,
+            'saved_at': time.time(),
+            'containers': [c.to_record() for c in containers],
+        }
+        try:
+            write_atomic(cache_path(self.filename),
+                         json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        except OSError as e:
+            logger.warning("Failed to save the %s container snapshot: %s", self.host, e)
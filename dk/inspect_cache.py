@@ -0,0 +1,107 @@
+"""
+Cache of full container inspect results
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from dk.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class InspectCache():
+    """
+    Keeps the docker Container objects (full inspect) of recently viewed
+    containers. Entries are dropped when the daemon reports a change for the
+    container and expire after a TTL as a safety net for missed events.
+    """
+
+    def __init__(self, docker_client, ttl=30, max_entries=128,
+                 prefetch_workers=2):
+        self.docker_client = docker_client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._pending = set()
+        # Bumped on every invalidation so in-flight fetches don't store stale data
+        self._generation = 0
+        self._pool = ThreadPoolExecutor(max_workers=prefetch_workers,
+                                        thread_name_prefix="dk-prefetch")
+
+    def get(self, container_id):
+        """
+        Returns the inspected container, from memory when possible
+        Args:
+          container_id (str): The container id
+        Raises:
+          docker.errors.NotFound: When the container does not exist
+        """
+        container = self._lookup(container_id)
+        metrics.cache('inspect', container is not None)
+        if container is not None:
+            return container
+        return self._fetch(container_id)
+
+    def invalidate(self, container_id=None):
+        """
+        Drops the cached entry of a container, or all entries when no id
+        is given
+        """
+        with self._lock:
+            self._generation += 1
+            if container_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(container_id, None)
+
+    def close(self):
+        """ Stops the prefetch workers """
+        self._pool.shutdown(wait=False)
+
+    def prefetch(self, container_ids):
+        """ Inspects the containers in the background if not cached yet """
+        for container_id in container_ids:
+            with self._lock:
+                if container_id in self._pending or self._is_fresh(container_id):
+                    continue
+                self._pending.add(container_id)
+            self._pool.submit(self._prefetch, container_id)
+
+    def _prefetch(self, container_id):
+        try:
+            self._fetch(container_id)
+        except Exception as e:
+            logger.debug("Failed to prefetch container %s: %s", container_id, e)
+        finally:
+            with self._lock:
+                self._pending.discard(container_id)
+
+    def _is_fresh(self, container_id):
+        entry = self._entries.get(container_id)
+        return entry is not None and time.monotonic() - entry[0] < self.ttl
+
+    def _lookup(self, container_id):
+        with self._lock:
+            if not self._is_fresh(container_id):
+                self._entries.pop(container_id, None)
+                return None
+            self._entries.move_to_end(container_id)
+            return self._entries[container_id][1]
+
+    def _fetch(self, container_id):
+        with self._lock:
+            generation = self._generation
+        container = self.docker_client.containers.get(container_id)
+        with self._lock:
+            if generation != self._generation:
+                return container
+            self._entries[container_id] = (time.monotonic(), container)
+            self._entries.move_to_end(container_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return container
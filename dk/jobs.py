@@ -0,0 +1,101 @@
+"""
+Background executor for container actions
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def container_job_key(host, container_id):
+    """ Deduplication key of the jobs acting on a container """
+    return "%s/%s" % (host, container_id[:12])
+
+
+class JobExecutor():
+    """
+    Runs long container actions (start/stop/restart) on a bounded thread pool
+    so the extension keeps answering queries while they run. Only one job per
+    key (usually the container id) can be in flight at a time, a bulk job
+    holds the keys of every container it targets.
+    """
+
+    def __init__(self, notify, max_workers=4):
+        """
+        Args:
+          notify (callable): Called with a message to surface to the user
+          max_workers (int): Maximum number of jobs running concurrently
+        """
+        self._notify = notify
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="dk-job")
+        self._lock = threading.Lock()
+        self._running = {}
+
+    def submit(self, key, label, fn, *args, timeout=None):
+        """
+        Schedules fn(*args) in the background
+        Args:
+          key (str|tuple): Deduplication key, e.g. the container id, or a
+            tuple of keys all held by the job
+          label (str): Human readable job name used in notifications
+          fn (callable): The job. It is responsible for its own success
+            notification
+          timeout (int): Seconds after which the job is reported as timed out
+        Returns:
+          bool: False when a job holding one of the keys is already in flight
+        """
+        keys = key if isinstance(key, tuple) else (key,)
+        with self._lock:
+            if any(k in self._running for k in keys):
+                self._notify("%s is already in progress" % label)
+                return False
+
+            watchdog = None
+            if timeout:
+                watchdog = threading.Timer(timeout, self._on_timeout,
+                                           (keys, label, timeout))
+                watchdog.daemon = True
+            for k in keys:
+                self._running[k] = watchdog
+
+        if watchdog is not None:
+            watchdog.start()
+
+        try:
+            self._pool.submit(self._run, keys, label, fn, args)
+        except RuntimeError as e:
+            # Pool already shut down
+            self._finish(keys)
+            logger.error("Failed to schedule %s: %s", label, e)
+            return False
+        return True
+
+    def shutdown(self, wait=False):
+        """ Stops accepting new jobs """
+        self._pool.shutdown(wait=wait)
+
+    def _run(self, keys, label, fn, args):
+        try:
+            fn(*args)
+        except Exception as e:
+            logger.error("%s failed: %s", label, e)
+            self._notify("%s failed" % label)
+        finally:
+            self._finish(keys)
+
+    def _finish(self, keys):
+        with self._lock:
+            watchdogs = {self._running.pop(k, None) for k in keys}
+        for watchdog in watchdogs:
+            if watchdog is not None:
+                watchdog.cancel()
+
+    def _on_timeout(self, keys, label, timeout):
+        with self._lock:
+            if keys[0] not in self._running:
+                return
+        logger.warning("%s still running after %ss", label, timeout)
+        self._notify("%s timed out after %ss" % (label, timeout))
@@ -1,29 +1,80 @@
 import logging
 from ulauncher.api.client.EventListener import EventListener
 from dk.actions import ACTION_RESTART_CONTAINER, ACTION_STOP_CONTAINER, ACTION_START_CONTAINER, ACTION_DETAIL_CONTAINER
+from dk.actions import ACTION_BULK_START, ACTION_BULK_STOP, ACTION_BULK_RESTART, ACTION_PRUNE
+from dk.actions import ACTION_METRICS_DUMP, ACTION_PROJECT_DETAILS
+from dk.actions import ACTION_PROJECT_START, ACTION_PROJECT_STOP, ACTION_PROJECT_RESTART
+from dk.actions import ACTION_IMAGE_DETAILS, ACTION_IMAGE_PULL, ACTION_IMAGE_REMOVE
+from dk.bulk import OPERATION_START, OPERATION_STOP, OPERATION_RESTART
+from dk.metrics import metrics, timed
 
 logger = logging.getLogger(__name__)
 
+BULK_OPERATIONS = {
+    ACTION_BULK_START: OPERATION_START,
+    ACTION_BULK_STOP: OPERATION_STOP,
+    ACTION_BULK_RESTART: OPERATION_RESTART,
+}
+
+PROJECT_OPERATIONS = {
+    ACTION_PROJECT_START: OPERATION_START,
+    ACTION_PROJECT_STOP: OPERATION_STOP,
+    ACTION_PROJECT_RESTART: OPERATION_RESTART,
+}
+
 
 class ItemEnterEventListener(EventListener):
     """ Listener that handles the click on an item """
 
     # pylint: disable=unused-argument,no-self-use
+    @timed('listener.item_enter')
     def on_event(self, event, extension):
         """ Handles the event """
         data = event.get_data()
 
         if data['action'] == ACTION_RESTART_CONTAINER:
             logger.info("Restarting container %s", data['id'])
-            extension.restart_container(data['id'])
+            extension.restart_container(data['id'], data.get('host'))
 
         if data['action'] == ACTION_STOP_CONTAINER:
             logger.info("Stopping container %s", data['id'])
-            extension.stop_container(data['id'])
+            extension.stop_container(data['id'], data.get('host'))
 
         if data['action'] == ACTION_START_CONTAINER:
             logger.info("Starting container %s", data['id'])
-            extension.start_container(data['id'])
+            extension.start_container(data['id'], data.get('host'))
+
+        if data['action'] in BULK_OPERATIONS:
+            operation = BULK_OPERATIONS[data['action']]
+            logger.info("Bulk %s of %d containers", operation, len(data['targets']))
+            extension.bulk_container_action(operation, data['targets'])
+
+        if data['action'] in PROJECT_OPERATIONS:
+            operation = PROJECT_OPERATIONS[data['action']]
+            logger.info("Project %s %s", data['project'], operation)
+            extension.project_action(operation, data['project'], data.get('host'))
+
+        if data['action'] == ACTION_PRUNE:
+            logger.info("Pruning %s", ', '.join(data['categories']))
+            extension.run_prune(data['categories'])
+
+        if data['action'] == ACTION_IMAGE_REMOVE:
+            logger.info("Removing image %s", data['reference'])
+            extension.remove_image(data['reference'], data.get('host'))
+
+        if data['action'] == ACTION_IMAGE_PULL:
+            logger.info("Pulling image %s", data['reference'])
+            extension.pull_image(data['reference'], data.get('host'))
+
+        if data['action'] == ACTION_METRICS_DUMP:
+            metrics.dump()
+
+        if data['action'] == ACTION_IMAGE_DETAILS:
+            return extension.show_image(data['image_id'], data.get('host'))
+
+        if data['action'] == ACTION_PROJECT_DETAILS:
+            return extension.show_project(data['project'], data.get('host'))
 
         if data['action'] == ACTION_DETAIL_CONTAINER:
-            return extension.show_container_details(data['container_id'])
+            return extension.show_container_details(data['container_id'],
+                                                    data.get('host'))
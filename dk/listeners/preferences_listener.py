@@ -0,0 +1,23 @@
+from ulauncher.api.client.EventListener import EventListener
+
+
+class PreferencesEventListener(EventListener):
+    """ Listener that applies the preferences loaded at startup """
+
+    # pylint: disable=unused-argument,no-self-use
+    def on_event(self, event, extension):
+        """ Handles the event """
+        extension.configure_metrics(event.preferences.get("diagnostics"))
+
+
+class PreferencesUpdateEventListener(EventListener):
+    """ Listener that applies preference changes at runtime """
+
+    # pylint: disable=unused-argument,no-self-use
+    def on_event(self, event, extension):
+        """ Handles the event """
+        if event.id == "docker_hosts":
+            extension.configure_hosts(event.new_value)
+
+        if event.id == "diagnostics":
+            extension.configure_metrics(event.new_value)
@@ -1,4 +1,6 @@
 from ulauncher.api.client.EventListener import EventListener
+from dk.metrics import timed
+from dk.query import parse_query
 
 
 class KeywordQueryEventListener(EventListener):
@@ -12,32 +14,58 @@ class KeywordQueryEventListener(EventListener):
         import re
         query = event.get_argument() or ""
         
-        # Only allow alphanumeric, spaces, and basic punctuation
-        if query and not re.match(r'^[a-zA-Z0-9\s._-]+$', query):
+        # Only allow alphanumeric, spaces, basic punctuation and the
+        # separators of the structured filters (status:exited label:env=dev)
+        if query and not re.match(r'^[a-zA-Z0-9\s._:=/,-]+$', query):
             # Reject malicious queries
             from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
             from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
             from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
-            return RenderResultListAction([
+            action = RenderResultListAction([
                 ExtensionResultItem(
                     icon=extension.icon_path,
                     name='Invalid query',
                     description='Query contains invalid characters',
                     on_enter=HideWindowAction())
             ])
+            # Still goes through the scheduler so it supersedes running queries
+            extension.queries.submit(event, lambda: action)
+            return None
         
         kw = self.get_keyword_id(extension, event.get_keyword())
 
+        # PERFORMANCE: Rendered off the event loop, a burst of keystrokes only
+        # renders the latest query and superseded results are never shown
+        extension.queries.submit(event, self.render, extension, kw, query)
+
+    @timed('listener.query')
+    def render(self, extension, kw, query):
+        """ Renders the view of the keyword """
         if kw == "kw_info":
             return extension.show_docker_info()
 
+        if kw == "kw_top":
+            return extension.show_top(query)
+
+        if kw == "kw_compose":
+            return extension.show_projects(query)
+
+        if kw == "kw_images":
+            return extension.show_images(query)
+
+        if kw == "kw_logs":
+            return extension.show_logs(query)
+
+        if kw == "kw_stats":
+            return extension.show_stats(query)
+
         if kw == "kw_prune":
             return extension.prune()
 
         if kw == "kw_documentation":
             return extension.search_documentation(query)
 
-        return extension.list_containers(query)
+        return extension.list_containers(parse_query(query))
 
     def get_keyword_id(self, extension, keyword):
         """ Returns the keyword ID from the keyword name """
@@ -0,0 +1,283 @@
+"""
+Bounded, incrementally updated container log tails
+"""
+
+import calendar
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+# Lines fetched when a tail starts, and kept per container
+TAIL_LINES = 500
+
+# Longer lines are cut so a single line can't blow the buffer size
+MAX_LINE_LENGTH = 500
+
+# Containers whose tail is kept in memory per host
+MAX_TAILS = 4
+
+
+def parse_timestamp(value):
+    """
+    Converts a RFC 3339 log timestamp ("2024-01-01T10:00:00.123456789Z")
+    to a Unix time, None when it can't be parsed
+    """
+    try:
+        seconds = calendar.timegm(time.strptime(value[:19], '%Y-%m-%dT%H:%M:%S'))
+        fraction = value[19:].rstrip('Z')
+        return seconds + (float('0' + fraction) if fraction.startswith('.') else 0.0)
+    except ValueError:
+        return None
+
+
+def is_read_timeout(error):
+    """ Whether an exception, or one it wraps, is a socket read timeout """
+    import socket
+    from urllib3.exceptions import ReadTimeoutError
+    from requests.exceptions import ReadTimeout
+
+    # Bounded walk, the wrapping chain is never deep
+    for _ in range(5):
+        if error is None:
+            break
+        if isinstance(error, (socket.timeout, ReadTimeoutError, ReadTimeout)):
+            return True
+        # requests wraps urllib3 errors in ConnectionError(original)
+        wrapped = error.args[0] if error.args else None
+        error = wrapped if isinstance(wrapped, BaseException) else error.__context__
+    return False
+
+
+class LogBuffer():
+    """
+    Ring buffer of the last lines of a container, filled by following its
+    logs in the background. The stream stops after IDLE_TIMEOUT seconds
+    without a touch() and resumes where it stopped on the next one, so lines
+    are downloaded once no matter how often the view is rendered.
+    """
+
+    IDLE_TIMEOUT = 60
+
+    # Seconds before a stream that ended by itself (stopped container) is
+    # reopened, so keystrokes don't each cost a logs call
+    RESTART_DELAY = 2
+
+    def __init__(self, docker_client, container_id, max_lines=TAIL_LINES):
+        """
+        Args:
+          docker_client (docker.DockerClient): The client to follow with
+          container_id (str): The container id
+          max_lines (int): Number of lines kept
+        """
+        self.docker_client = docker_client
+        self.container_id = container_id
+        # (unix time, line) tuples, oldest first
+        self.lines = deque(maxlen=max_lines)
+        self.error = None
+        self._lock = threading.Lock()
+        self._stream = None
+        self._thread = None
+        self._last_touch = 0
+        self._ended_at = None
+        self._first_chunk = threading.Event()
+
+    @property
+    def following(self):
+        """ Whether the logs are being streamed """
+        return self._thread is not None and self._thread.is_alive()
+
+    def touch(self):
+        """ Keeps the stream open, (re)starting it if needed """
+        self._last_touch = time.monotonic()
+        with self._lock:
+            if self.following:
+                return
+            if self._ended_at is not None and time.monotonic() - self._ended_at < self.RESTART_DELAY:
+                return
+            self._first_chunk.clear()
+            self._thread = threading.Thread(target=self._follow,
+                                            name="dk-logs",
+                                            daemon=True)
+            self._thread.start()
+        self._schedule_idle_check(self.IDLE_TIMEOUT)
+
+    def wait(self, timeout):
+        """ Waits until the first chunk of the current stream arrived """
+        return self._first_chunk.wait(timeout)
+
+    def search(self, words, limit=None):
+        """
+        Returns the lines holding every word, newest first
+        Args:
+          words (list): Lowercase words to look for
+          limit (int): Maximum number of lines returned
+        """
+        with self._lock:
+            lines = list(self.lines)
+        results = []
+        for entry in reversed(lines):
+            text = entry[1].lower()
+            if all(word in text for word in words):
+                results.append(entry)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    def close(self):
+        """ Stops following the logs """
+        self._last_touch = 0
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception as e:
+                logger.debug("Failed to close the logs stream: %s", e)
+
+    def _schedule_idle_check(self, delay):
+        # A quiet container never wakes the reader up, so idleness is
+        # checked from a timer
+        timer = threading.Timer(delay, self._check_idle)
+        timer.daemon = True
+        timer.start()
+
+    def _check_idle(self):
+        idle = time.monotonic() - self._last_touch
+        if idle >= self.IDLE_TIMEOUT:
+            self.close()
+        elif self.following:
+            self._schedule_idle_check(self.IDLE_TIMEOUT - idle)
+
+    def _follow(self):
+        try:
+            # The client read timeout also applies to the follow stream: a
+            # quiet container is not an error, reopen where it stopped
+            while self._follow_once() and time.monotonic() - self._last_touch < self.IDLE_TIMEOUT:
+                logger.debug("Logs of %s quiet, reopening the stream", self.container_id)
+        finally:
+            self._ended_at = time.monotonic()
+            self._first_chunk.set()
+
+    def _follow_once(self):
+        """ Streams the logs until they end, returns True on a read timeout """
+        with self._lock:
+            last = self.lines[-1] if self.lines else None
+
+        kwargs = {'tail': self.lines.maxlen}
+        if last is not None and last[0]:
+            # Resume: only what was logged since the last known line
+            kwargs['since'] = last[0]
+
+        try:
+            self._stream = self.docker_client.api.logs(self.container_id,
+                                                       stream=True,
+                                                       follow=True,
+                                                       timestamps=True,
+                                                       **kwargs)
+            self.error = None
+            pending = b''
+            for chunk in self._stream:
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                last = self._append(lines, last)
+                self._first_chunk.set()
+                if time.monotonic() - self._last_touch > self.IDLE_TIMEOUT:
+                    break
+            if pending:
+                self._append([pending], last)
+        except Exception as e:
+            if is_read_timeout(e):
+                return True
+            logger.warning("Failed to follow the logs of %s: %s", self.container_id, e)
+            self.error = e
+        finally:
+            stream, self._stream = self._stream, None
+            if stream is not None:
+                stream.close()
+        return False
+
+    def _append(self, raw_lines, resumed_after):
+        """
+        Adds decoded lines to the buffer. Returns the line to resume after
+        while the already buffered lines are still being replayed
+        """
+        entries = []
+        for raw in raw_lines:
+            line = raw.decode('utf-8', 'replace').rstrip('\r')
+            stamp, _, text = line.partition(' ')
+            timestamp = parse_timestamp(stamp)
+            if timestamp is None:
+                timestamp, text = None, line
+            if resumed_after is not None and timestamp is not None:
+                # "since" is inclusive, skip what the buffer already holds
+                if timestamp < resumed_after[0] or (
+                        timestamp == resumed_after[0] and text[:MAX_LINE_LENGTH] == resumed_after[1]):
+                    continue
+                resumed_after = None
+            entries.append((timestamp, text[:MAX_LINE_LENGTH]))
+        with self._lock:
+            self.lines.extend(entries)
+        return resumed_after
+
+
+class LogBuffers():
+    """ The log buffers of the recently viewed containers of a host """
+
+    def __init__(self, docker_client, index=None, max_buffers=MAX_TAILS):
+        """
+        Args:
+          docker_client (docker.DockerClient): The client of the host
+          index (ContainerIndex): Optional index of the host, the buffers of
+            destroyed containers are dropped from its change notifications
+          max_buffers (int): Maximum number of containers followed at once
+        """
+        self.docker_client = docker_client
+        self.index = index
+        self.max_buffers = max_buffers
+        self._lock = threading.Lock()
+        self._buffers = OrderedDict()
+        if index is not None:
+            index.subscribe(self._changed)
+
+    def get(self, container_id):
+        """ Returns the buffer of a container, following its logs """
+        with self._lock:
+            buffer = self._buffers.get(container_id)
+            if buffer is None:
+                buffer = self._buffers[container_id] = LogBuffer(self.docker_client,
+                                                                 container_id)
+            self._buffers.move_to_end(container_id)
+            evicted = []
+            while len(self._buffers) > self.max_buffers:
+                evicted.append(self._buffers.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        buffer.touch()
+        return buffer
+
+    def close(self):
+        """ Stops following the logs of every container """
+        with self._lock:
+            buffers = list(self._buffers.values())
+            self._buffers.clear()
+        for buffer in buffers:
+            buffer.close()
+
+    def discard(self, container_id):
+        """ Drops the buffer of a removed container """
+        with self._lock:
+            buffer = self._buffers.pop(container_id, None)
+        if buffer is not None:
+            buffer.close()
+
+    def _changed(self, container_id):
+        if container_id is None:
+            with self._lock:
+                followed = list(self._buffers)
+        else:
+            followed = [container_id]
+        for followed_id in followed:
+            if self.index.get(followed_id) is None:
+                self.discard(followed_id)
@@ -0,0 +1,265 @@
+"""
+Lightweight timing spans and cache counters for the hot paths
+"""
+
+import bisect
+import functools
+import json
+import logging
+import re
+import threading
+import time
+
+from dk.paths import cache_path, write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds of the latency histogram buckets, roughly
+# 1.5x apart from 50us to 30s. The last bucket catches everything above
+BUCKET_BOUNDS = tuple(round(0.05 * 1.5 ** i, 3) for i in range(34))
+
+# Seconds between two dumps when dumping is enabled
+DUMP_INTERVAL = 60
+
+DUMP_FILE = 'metrics.json'
+
+_VERSION_PREFIX = re.compile(r'^/v[0-9.]+')
+_OBJECT_PATH = re.compile(
+    r'^/(containers|images|networks|volumes|exec|plugins)/'
+    r'(?!json$|create$|prune$|search$|load$|get$)[^/]+')
+
+
+class Histogram():
+    """ Fixed bucket latency histogram, O(1) to record """
+
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def record(self, ms):
+        """ Adds a duration in milliseconds """
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, ms)] += 1
+
+    def percentile(self, p):
+        """ Upper bound of the bucket holding the p-th percentile, in ms """
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                return min(BUCKET_BOUNDS[i], self.max) if i < len(BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def as_dict(self):
+        """ Summary of the histogram as plain data """
+        return {
+            'count': self.count,
+            'total_ms': round(self.total, 3),
+            'max_ms': round(self.max, 3),
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+        }
+
+
+class _Span():
+    """ Context manager recording its duration into a histogram """
+
+    __slots__ = ('registry', 'name', 'started')
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+        self.started = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.record(self.name, (time.perf_counter() - self.started) * 1000)
+
+
+class _NoopSpan():
+    """ Shared span used while metrics are disabled """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Metrics():
+    """
+    Registry of timing histograms and hit/miss counters. Disabled by
+    default: every entry point is then a single attribute check.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._spans = {}
+        self._caches = {}
+        self._dump_interval = 0
+        self._dumper = None
+
+    def configure(self, enabled, dump_interval=0):
+        """
+        Args:
+          enabled (bool): Whether to record anything
+          dump_interval (int): Seconds between JSON dumps to the log and the
+            cache directory, 0 to never dump
+        """
+        self.enabled = bool(enabled)
+        self._dump_interval = dump_interval if self.enabled else 0
+        if self._dump_interval and (self._dumper is None or not self._dumper.is_alive()):
+            self._dumper = threading.Thread(target=self._dump_loop,
+                                            name="dk-metrics-dump",
+                                            daemon=True)
+            self._dumper.start()
+
+    def reset(self):
+        """ Drops everything recorded so far """
+        with self._lock:
+            self._spans = {}
+            self._caches = {}
+            self.started_at = time.monotonic()
+
+    def span(self, name):
+        """
+        Times a block:
+
+            with metrics.span('docker.list'):
+                ...
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name)
+
+    def record(self, name, ms):
+        """ Adds a duration in milliseconds to the named histogram """
+        with self._lock:
+            histogram = self._spans.get(name)
+            if histogram is None:
+                histogram = self._spans[name] = Histogram()
+            histogram.record(ms)
+
+    def cache(self, name, hit):
+        """
+        Counts a cache lookup
+        Args:
+          name (str): The cache name
+          hit (bool): Whether the lookup was served from the cache
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            counters = self._caches.get(name)
+            if counters is None:
+                counters = self._caches[name] = [0, 0]
+            counters[0 if hit else 1] += 1
+
+    def snapshot(self):
+        """ Returns everything recorded as plain data """
+        with self._lock:
+            spans = {name: h.as_dict() for name, h in self._spans.items()}
+            caches = {
+                name: {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': round(hits / float(hits + misses), 3) if hits + misses else 0.0
+                }
+                for name, (hits, misses) in self._caches.items()
+            }
+        return {
+            'uptime_s': round(time.monotonic() - self.started_at, 1),
+            'spans': spans,
+            'caches': caches,
+        }
+
+    def dump(self):
+        """ Logs the snapshot and writes it as JSON to the cache directory """
+        data = json.dumps(self.snapshot(), sort_keys=True)
+        logger.info("Metrics: %s", data)
+        try:
+            write_atomic(cache_path(DUMP_FILE), data.encode('utf-8'))
+        except OSError as e:
+            logger.warning("Failed to write metrics dump: %s", e)
+
+    def _dump_loop(self):
+        while self._dump_interval:
+            time.sleep(self._dump_interval)
+            if self._dump_interval:
+                self.dump()
+
+
+metrics = Metrics()
+
+
+def timed(name):
+    """ Decorator timing every call of a function under the given span name """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.record(name, (time.perf_counter() - started) * 1000)
+        return wrapper
+    return decorator
+
+
+def api_route(method, url):
+    """
+    Span name of an Engine API request: "docker GET /containers/{id}/json".
+    Object ids and names are folded so routes aggregate.
+    """
+    path = url.split('://', 1)[-1]
+    path = path[path.find('/'):] if '/' in path else '/'
+    path = _VERSION_PREFIX.sub('', path.split('?', 1)[0])
+    path = _OBJECT_PATH.sub(r'/\1/{id}', path)
+    return 'docker %s %s' % (method.upper(), path)
+
+
+def instrument_client(docker_client):
+    """
+    Times every Engine API request of a docker client. The low level client
+    is a requests Session, so wrapping its request() covers every SDK call.
+    Streaming calls (events, logs) are timed until the response headers.
+    """
+    api = docker_client.api
+    if getattr(api, '_dk_instrumented', False):
+        return
+    request = api.request
+
+    def instrumented(method, url, *args, **kwargs):
+        if not metrics.enabled:
+            return request(method, url, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return request(method, url, *args, **kwargs)
+        finally:
+            metrics.record(api_route(method, url), (time.perf_counter() - started) * 1000)
+
+    api.request = instrumented
+    api._dk_instrumented = True
@@ -0,0 +1,45 @@
+"""
+On-disk locations used by the extension
+"""
+
+import os
+import tempfile
+
+APP_DIR = 'ulauncher-docker'
+
+
+def cache_path(name):
+    """
+    Returns the path of a file in the XDG cache directory of the extension,
+    creating the directory if needed
+    Args:
+      name (str): The file name
+    """
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    directory = os.path.join(base, APP_DIR)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return os.path.join(directory, name)
+
+
+def write_atomic(path, data):
+    """
+    Writes bytes to path atomically: readers see either the old or the new
+    content, never a partial file
+    Args:
+      path (str): Destination file
+      data (bytes): Content to write
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,125 @@
+"""
+Containers grouped by docker compose project
+"""
+
+import threading
+
+from dk.search import COMPOSE_PROJECT_LABEL, COMPOSE_SERVICE_LABEL
+
+HEALTHY = 'healthy'
+UNHEALTHY = 'unhealthy'
+STARTING = 'starting'
+
+
+def container_health(container):
+    """ The healthcheck state shown in the list Status text, None without one """
+    text = container.state_text or ''
+    if '(unhealthy)' in text:
+        return UNHEALTHY
+    if '(healthy)' in text:
+        return HEALTHY
+    if '(health: starting)' in text:
+        return STARTING
+    return None
+
+
+class ComposeProject():
+    """ The containers of a compose project on a single host """
+
+    __slots__ = ('name', 'host', 'containers')
+
+    def __init__(self, name, host, containers):
+        self.name = name
+        self.host = host
+        self.containers = sorted(containers, key=lambda c: c.name)
+
+    @property
+    def running(self):
+        """ Number of running containers """
+        return sum(1 for c in self.containers if c.status == 'running')
+
+    @property
+    def services(self):
+        """ Sorted compose service names """
+        return sorted({(c.labels or {}).get(COMPOSE_SERVICE_LABEL, c.name)
+                       for c in self.containers})
+
+    def health_counts(self):
+        """ Returns a {state: count} dict of the containers with a healthcheck """
+        counts = {}
+        for container in self.containers:
+            health = container_health(container)
+            if health is not None:
+                counts[health] = counts.get(health, 0) + 1
+        return counts
+
+
+class ComposeProjects():
+    """
+    Compose projects of a container index, updated from the index change
+    notifications so no query ever lists containers to group them
+    """
+
+    def __init__(self, index):
+        """
+        Args:
+          index (ContainerIndex): The index to group, kept in sync
+        """
+        self.index = index
+        self._lock = threading.Lock()
+        # Project -> {container id: ContainerSummary}
+        self._projects = {}
+        # Container id -> project, to move containers between projects
+        self._membership = {}
+        index.subscribe(self._changed)
+        if index.ready:
+            self._rebuild()
+
+    def all(self):
+        """ Returns the ComposeProject of every project """
+        with self._lock:
+            return [ComposeProject(name, self.index.host, list(containers.values()))
+                    for name, containers in self._projects.items()]
+
+    def get(self, name):
+        """ Returns the ComposeProject with the given name, or None """
+        with self._lock:
+            containers = self._projects.get(name)
+            if not containers:
+                return None
+            return ComposeProject(name, self.index.host, list(containers.values()))
+
+    def _changed(self, container_id):
+        if container_id is None:
+            self._rebuild()
+            return
+
+        container = self.index.get(container_id)
+        with self._lock:
+            self._discard(container_id)
+            if container is not None:
+                self._add(container)
+
+    def _rebuild(self):
+        containers = self.index.all()
+        with self._lock:
+            self._projects = {}
+            self._membership = {}
+            for container in containers:
+                self._add(container)
+
+    def _add(self, container):
+        project = (container.labels or {}).get(COMPOSE_PROJECT_LABEL)
+        if project:
+            self._projects.setdefault(project, {})[container.id] = container
+            self._membership[container.id] = project
+
+    def _discard(self, container_id):
+        project = self._membership.pop(container_id, None)
+        if project is None:
+            return
+        containers = self._projects.get(project)
+        if containers is not None:
+            containers.pop(container_id, None)
+            if not containers:
+                del self._projects[project]
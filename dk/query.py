@@ -0,0 +1,80 @@
+"""
+Structured container queries: "status:exited image:postgres billing"
+"""
+
+import re
+
+from dk.search import FILTER_FIELDS, FILTER_IP, FILTER_PUBLISH, FILTER_STATUS
+
+# Matches every status with status:all (or status:any)
+STATUS_ANY = ('all', 'any')
+
+_FILTER_TERM = re.compile(r'^([a-z]+):(\S+)$')
+
+# Shorthands of the reverse lookups: ":8080" for publish:8080 and a bare
+# container address for ip:172.18.0.5
+_HOST_PORT = re.compile(r'^:(\d+(?:/[a-z]+)?)$')
+_IP_ADDRESS = re.compile(r'^\d{1,3}(?:\.\d{1,3}){3}$')
+
+
+class ContainerQuery():
+    """
+    A parsed query: structured filters plus the remaining free text. Terms of
+    the same field are alternatives (status:exited,created), different
+    fields must all match.
+    """
+
+    __slots__ = ('raw', 'text', 'filters', 'any_status')
+
+    def __init__(self, raw, text='', filters=None, any_status=False):
+        self.raw = raw
+        self.text = text
+        self.filters = filters or []
+        self.any_status = any_status
+
+    @property
+    def has_status(self):
+        """ Whether the query selects containers by status itself """
+        return self.any_status or any(field == FILTER_STATUS for field, _ in self.filters)
+
+    def __repr__(self):
+        return '<ContainerQuery: %r>' % self.raw
+
+
+def parse_query(query):
+    """
+    Splits a query into filters and free text. Unknown "field:value" terms
+    are kept as free text, ":8080" and "172.18.0.5" are read as publish:
+    and ip: filters. Already parsed queries are returned as is.
+    Args:
+      query (str|ContainerQuery): The user input
+    """
+    if isinstance(query, ContainerQuery):
+        return query
+
+    raw = query or ""
+    words = []
+    values = {}
+    for term in raw.split():
+        term_lower = term.lower()
+        match = _HOST_PORT.match(term_lower)
+        if match is not None:
+            values.setdefault(FILTER_PUBLISH, []).append(match.group(1))
+            continue
+        if _IP_ADDRESS.match(term_lower):
+            values.setdefault(FILTER_IP, []).append(term_lower)
+            continue
+
+        match = _FILTER_TERM.match(term_lower)
+        if match is None or match.group(1) not in FILTER_FIELDS:
+            words.append(term)
+            continue
+        field, value = match.groups()
+        values.setdefault(field, []).extend(v for v in value.split(',') if v)
+
+    any_status = any(v in STATUS_ANY for v in values.get(FILTER_STATUS, ()))
+    if any_status:
+        # No constraint, but still lifts the running only default
+        del values[FILTER_STATUS]
+    filters = [(field, tuple(field_values)) for field, field_values in values.items()]
+    return ContainerQuery(raw, ' '.join(words), filters, any_status)
@@ -0,0 +1,53 @@
+"""
+Cache of the result items rendered for a container
+"""
+
+import threading
+from collections import OrderedDict
+
+from dk.metrics import metrics
+
+
+class RenderCache():
+    """
+    Keeps the items rendered for recently shown containers, each one with
+    the fingerprint of the fields it was built from. A container whose
+    fingerprint is unchanged reuses its items instead of rebuilding them.
+    Fingerprints are compared for equality, not hashed, so they may hold
+    the dicts of an inspect payload as they are.
+    """
+
+    def __init__(self, name, max_entries=256):
+        """
+        Args:
+          name (str): Reported in the cache hit rates of dk:stats
+          max_entries (int): Containers kept, least recently shown evicted
+        """
+        self.name = 'render.%s' % name
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, fingerprint):
+        """ Returns the items cached for the key and fingerprint, or None """
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and entry[0] == fingerprint
+            if hit:
+                self._entries.move_to_end(key)
+        metrics.cache(self.name, hit)
+        return entry[1] if hit else None
+
+    def put(self, key, fingerprint, items):
+        """ Caches the items rendered for the key and returns them """
+        with self._lock:
+            self._entries[key] = (fingerprint, items)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return items
+
+    def clear(self):
+        """ Drops every cached entry """
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,222 @@
+"""
+Background sampling of container resource usage
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Samples kept per container
+HISTORY_SIZE = 30
+
+
+class StatsSample():
+    """ Raw cumulative counters of a single stats() call """
+
+    __slots__ = ('time', 'cpu_total', 'system_cpu', 'online_cpus', 'mem_usage',
+                 'mem_limit', 'net_rx', 'net_tx', 'blk_read', 'blk_write')
+
+    def __init__(self, time, cpu_total, system_cpu, online_cpus, mem_usage,
+                 mem_limit, net_rx, net_tx, blk_read, blk_write):
+        self.time = time
+        self.cpu_total = cpu_total
+        self.system_cpu = system_cpu
+        self.online_cpus = online_cpus
+        self.mem_usage = mem_usage
+        self.mem_limit = mem_limit
+        self.net_rx = net_rx
+        self.net_tx = net_tx
+        self.blk_read = blk_read
+        self.blk_write = blk_write
+
+    @classmethod
+    def from_payload(cls, payload, now):
+        """
+        Args:
+          payload (dict): The /containers/{id}/stats response
+          now (float): Monotonic time of the sample
+        """
+        cpu = payload.get('cpu_stats') or {}
+        usage = cpu.get('cpu_usage') or {}
+        online_cpus = cpu.get('online_cpus') or len(usage.get('percpu_usage') or []) or 1
+
+        memory = payload.get('memory_stats') or {}
+        details = memory.get('stats') or {}
+        # Same as the CLI: page cache is not counted as used memory
+        cache = details.get('inactive_file', details.get('total_inactive_file', 0))
+        mem_usage = max((memory.get('usage') or 0) - (cache or 0), 0)
+
+        net_rx = net_tx = 0
+        for network in (payload.get('networks') or {}).values():
+            net_rx += network.get('rx_bytes') or 0
+            net_tx += network.get('tx_bytes') or 0
+
+        blk_read = blk_write = 0
+        blkio = (payload.get('blkio_stats') or {}).get('io_service_bytes_recursive') or []
+        for entry in blkio:
+            op = (entry.get('op') or '').lower()
+            if op == 'read':
+                blk_read += entry.get('value') or 0
+            elif op == 'write':
+                blk_write += entry.get('value') or 0
+
+        return cls(now, usage.get('total_usage') or 0,
+                   cpu.get('system_cpu_usage') or 0, online_cpus, mem_usage,
+                   memory.get('limit') or 0, net_rx, net_tx, blk_read, blk_write)
+
+
+class ContainerStats():
+    """ Rates computed between the two latest samples of a container """
+
+    __slots__ = ('container', 'cpu_percent', 'mem_usage', 'mem_limit',
+                 'mem_percent', 'net_rx_rate', 'net_tx_rate', 'blk_read_rate',
+                 'blk_write_rate')
+
+    def __init__(self, container, previous, current):
+        self.container = container
+        self.mem_usage = current.mem_usage
+        self.mem_limit = current.mem_limit
+        self.mem_percent = (100.0 * current.mem_usage / current.mem_limit
+                            if current.mem_limit else 0.0)
+
+        self.cpu_percent = 0.0
+        self.net_rx_rate = self.net_tx_rate = 0.0
+        self.blk_read_rate = self.blk_write_rate = 0.0
+        if previous is None:
+            return
+
+        cpu_delta = current.cpu_total - previous.cpu_total
+        system_delta = current.system_cpu - previous.system_cpu
+        if cpu_delta > 0 and system_delta > 0:
+            self.cpu_percent = 100.0 * cpu_delta / system_delta * current.online_cpus
+
+        elapsed = current.time - previous.time
+        if elapsed > 0:
+            # Counters reset when a container restarts, clamp to zero
+            self.net_rx_rate = max(current.net_rx - previous.net_rx, 0) / elapsed
+            self.net_tx_rate = max(current.net_tx - previous.net_tx, 0) / elapsed
+            self.blk_read_rate = max(current.blk_read - previous.blk_read, 0) / elapsed
+            self.blk_write_rate = max(current.blk_write - previous.blk_write, 0) / elapsed
+
+    @property
+    def net_rate(self):
+        """ Combined network throughput in bytes per second """
+        return self.net_rx_rate + self.net_tx_rate
+
+    @property
+    def io_rate(self):
+        """ Combined block IO throughput in bytes per second """
+        return self.blk_read_rate + self.blk_write_rate
+
+
+class StatsSampler():
+    """
+    Samples stats() of every running container of a host in parallel on a
+    bounded pool and keeps the samples in a ring buffer per container. The
+    sampler only runs while someone looks at the results: it starts on
+    touch() and stops after IDLE_TIMEOUT seconds without one.
+    """
+
+    INTERVAL = 2
+    IDLE_TIMEOUT = 60
+
+    def __init__(self, docker_client, index, max_workers=8):
+        """
+        Args:
+          docker_client (docker.DockerClient): The client to sample with
+          index (ContainerIndex): Source of the running containers
+          max_workers (int): Maximum number of concurrent stats() calls
+        """
+        self.docker_client = docker_client
+        self.index = index
+        self._pool = ThreadPoolExecutor(max_workers=max_workers,
+                                        thread_name_prefix="dk-stats")
+        self._lock = threading.Lock()
+        self._history = {}
+        self._last_touch = 0
+        self._thread = None
+        # one_shot skips the daemon side 1s wait for precpu stats, the deltas
+        # are computed between our own samples instead. docker-py refuses it
+        # below API 1.41
+        from docker.utils import version_gte
+        self._one_shot = version_gte(docker_client.api._version, '1.41')
+        self._closed = False
+
+    def touch(self):
+        """ Keeps the sampler alive, starting it if needed """
+        self._last_touch = time.monotonic()
+        with self._lock:
+            if self._closed:
+                return
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run,
+                                            name="dk-stats-sampler",
+                                            daemon=True)
+            self._thread.start()
+
+    def latest(self):
+        """ Returns the ContainerStats of every sampled running container """
+        results = []
+        with self._lock:
+            history = list(self._history.items())
+        for container_id, samples in history:
+            container = self.index.get(container_id)
+            if container is None or container.status != 'running' or not samples:
+                continue
+            previous = samples[-2] if len(samples) > 1 else None
+            results.append(ContainerStats(container, previous, samples[-1]))
+        return results
+
+    def close(self):
+        """ Stops sampling and the stats workers """
+        with self._lock:
+            self._closed = True
+            self._last_touch = 0
+        self._pool.shutdown(wait=False)
+
+    def _run(self):
+        while not self._closed and time.monotonic() - self._last_touch < self.IDLE_TIMEOUT:
+            started = time.monotonic()
+            try:
+                self._sample()
+            except Exception as e:
+                if self._closed:
+                    break
+                logger.error("Failed to sample container stats: %s", e)
+            time.sleep(max(self.INTERVAL - (time.monotonic() - started), 0.1))
+
+        # Nobody is watching anymore, free the history
+        with self._lock:
+            self._history = {}
+
+    def _sample(self):
+        running = [c.id for c in self.index.all() if c.status == 'running']
+        results = list(self._pool.map(self._sample_one, running))
+
+        with self._lock:
+            history = {}
+            for container_id, sample in zip(running, results):
+                samples = self._history.get(container_id)
+                if samples is None:
+                    samples = deque(maxlen=HISTORY_SIZE)
+                if sample is not None:
+                    samples.append(sample)
+                history[container_id] = samples
+            self._history = history
+
+    def _sample_one(self, container_id):
+        api = self.docker_client.api
+        try:
+            if self._one_shot:
+                payload = api.stats(container_id, stream=False, one_shot=True)
+            else:
+                payload = api.stats(container_id, stream=False)
+        except Exception as e:
+            logger.debug("Failed to get stats of %s: %s", container_id, e)
+            return None
+        return StatsSample.from_payload(payload, time.monotonic())
@@ -0,0 +1,89 @@
+"""
+Coalescing of keyword queries typed in quick succession
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class QueryScheduler():
+    """
+    Runs keyword queries one at a time on a background thread, newest
+    first. Every query gets a generation number: a query submitted while
+    another one is running replaces any query still waiting, and results of
+    a query superseded while it ran are dropped instead of being rendered.
+    Long running views poll superseded() to give up early.
+    """
+
+    def __init__(self, send):
+        """
+        Args:
+          send (callable): Called with (event, action) to deliver a result
+        """
+        self.send = send
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._running = None
+        self._pending = None
+        self._thread = None
+
+    @property
+    def generation(self):
+        """ The generation of the latest submitted query """
+        return self._generation
+
+    def submit(self, event, fn, *args):
+        """
+        Schedules a query, superseding the previous ones
+        Args:
+          event (KeywordQueryEvent): The event answered with fn's result
+          fn (callable): Renders the query, called with args
+        """
+        with self._condition:
+            self._generation += 1
+            if self._pending is not None:
+                logger.debug("Query %d coalesced", self._pending[0])
+            self._pending = (self._generation, event, fn, args)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run,
+                                                name="dk-query",
+                                                daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def superseded(self):
+        """
+        Whether the query being rendered on the calling thread was replaced
+        by a newer one. Always False outside the scheduler thread.
+        """
+        if threading.current_thread() is not self._thread:
+            return False
+        return self._running is not None and self._running != self._generation
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                generation, event, fn, args = self._pending
+                self._pending = None
+                self._running = generation
+
+            try:
+                action = fn(*args)
+            except Exception as e:
+                logger.error("Query failed: %s", e)
+                action = None
+            finally:
+                self._running = None
+
+            if generation != self._generation:
+                logger.debug("Query %d superseded, dropping its results", generation)
+                continue
+            if action is not None:
+                try:
+                    self.send(event, action)
+                except Exception as e:
+                    logger.error("Failed to send query results: %s", e)
@@ -0,0 +1,333 @@
+"""
+Local ranked fuzzy matching over the indexed containers
+"""
+
+import heapq
+import re
+from collections import defaultdict
+
+COMPOSE_PROJECT_LABEL = 'com.docker.compose.project'
+COMPOSE_SERVICE_LABEL = 'com.docker.compose.service'
+
+# Relative importance of each searchable field
+FIELD_WEIGHTS = {
+    'name': 10,
+    'service': 8,
+    'project': 6,
+    'image': 4,
+    'id': 3,
+    'ports': 2,
+}
+
+# Match quality by kind, multiplied by the field weight
+EXACT = 1.0
+PREFIX = 0.8
+WORD = 0.65
+SUBSTRING = 0.5
+FUZZY = 0.4
+
+MIN_FUZZY_SIMILARITY = 0.34
+
+# Structured filter fields, see dk.query
+FILTER_STATUS = 'status'
+FILTER_IMAGE = 'image'
+FILTER_LABEL = 'label'
+FILTER_PROJECT = 'project'
+FILTER_SERVICE = 'service'
+FILTER_PORT = 'port'
+FILTER_PUBLISH = 'publish'
+FILTER_IP = 'ip'
+FILTER_NETWORK = 'network'
+FILTER_FIELDS = (FILTER_STATUS, FILTER_IMAGE, FILTER_LABEL, FILTER_PROJECT,
+                 FILTER_SERVICE, FILTER_PORT, FILTER_PUBLISH, FILTER_IP,
+                 FILTER_NETWORK)
+
+# Fields whose values also match by prefix ("image:post" finds postgres:16,
+# "ip:172.18." a subnet). Ports only match exactly so port:80 does not find 8080
+PREFIX_FILTERS = (FILTER_STATUS, FILTER_IMAGE, FILTER_LABEL, FILTER_PROJECT,
+                  FILTER_SERVICE, FILTER_IP, FILTER_NETWORK)
+
+_WORD_SEPARATORS = re.compile(r'[\s/:._-]+')
+
+
+def tokenize(query):
+    """ Splits a query into lowercase search tokens """
+    return [token for token in (query or "").lower().split() if token]
+
+
+def trigrams(text):
+    """ Returns the set of 3 chars substrings of text """
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def filter_keys(container):
+    """ Returns the (field, value) pairs a container can be filtered on """
+    keys = {(FILTER_STATUS, container.status.lower())}
+
+    image = container.image.lower()
+    if image:
+        # "ghcr.io/org/app:1.2" is found as itself, "ghcr.io/org/app" and "app"
+        repository = image.split('@', 1)[0]
+        if ':' in repository.rsplit('/', 1)[-1]:
+            repository = repository.rsplit(':', 1)[0]
+        keys.update(((FILTER_IMAGE, image), (FILTER_IMAGE, repository),
+                     (FILTER_IMAGE, repository.rsplit('/', 1)[-1])))
+
+    for key, value in (container.labels or {}).items():
+        key = key.lower()
+        keys.add((FILTER_LABEL, key))
+        keys.add((FILTER_LABEL, '%s=%s' % (key, (value or '').lower())))
+        if key == COMPOSE_PROJECT_LABEL and value:
+            keys.add((FILTER_PROJECT, value.lower()))
+        elif key == COMPOSE_SERVICE_LABEL and value:
+            keys.add((FILTER_SERVICE, value.lower()))
+
+    for _, public, private, proto in container.ports:
+        for port in (public, private):
+            if port:
+                keys.add((FILTER_PORT, str(port)))
+                keys.add((FILTER_PORT, '%s/%s' % (port, proto)))
+        if public:
+            # Reverse lookup of the host ports: "who owns :8080?"
+            keys.add((FILTER_PUBLISH, str(public)))
+            keys.add((FILTER_PUBLISH, '%s/%s' % (public, proto)))
+
+    for network, ip_address in (container.networks or {}).items():
+        keys.add((FILTER_NETWORK, network.lower()))
+        if ip_address:
+            keys.add((FILTER_IP, ip_address))
+    return keys
+
+
+class SearchDocument():
+    """ Precomputed lowercase fields and trigrams of a single container """
+
+    __slots__ = ('id', 'name', 'fields', 'blob', 'trigrams', 'filter_keys')
+
+    def __init__(self, container):
+        labels = container.labels or {}
+        ports = ' '.join('%s %s/%s' % (public or '', private, proto)
+                         for _, public, private, proto in container.ports)
+        values = {
+            'name': container.name,
+            'service': labels.get(COMPOSE_SERVICE_LABEL, ''),
+            'project': labels.get(COMPOSE_PROJECT_LABEL, ''),
+            'image': container.image,
+            'id': container.short_id,
+            'ports': ports,
+        }
+        self.id = container.id
+        self.name = container.name.lower()
+
+        # (weight, text, " word1 word2") sorted by descending weight
+        fields = []
+        for key, value in values.items():
+            if value:
+                text = value.lower()
+                words = ' ' + ' '.join(_WORD_SEPARATORS.split(text))
+                fields.append((FIELD_WEIGHTS[key], text, words))
+        fields.sort(key=lambda f: -f[0])
+        self.fields = tuple(fields)
+        self.blob = '\x00'.join(text for _, text, _ in fields)
+
+        self.filter_keys = filter_keys(container)
+
+        self.trigrams = {}
+        for weight, text, _ in fields:
+            for gram in trigrams(text):
+                if weight > self.trigrams.get(gram, 0):
+                    self.trigrams[gram] = weight
+
+    def score_token(self, token, token_grams):
+        """ Returns the best score of a single token over all the fields """
+        if token in self.blob:
+            best = 0.0
+            for weight, text, words in self.fields:
+                if weight <= best:
+                    break
+                pos = text.find(token)
+                if pos < 0:
+                    continue
+                if pos == 0:
+                    quality = EXACT if len(text) == len(token) else PREFIX
+                elif (' ' + token) in words:
+                    quality = WORD
+                else:
+                    quality = SUBSTRING
+                if weight * quality > best:
+                    best = weight * quality
+            return best
+
+        if len(token) < 3:
+            return 0.0
+
+        # Typo tolerant fallback based on shared trigrams
+        shared = [self.trigrams[g] for g in token_grams if g in self.trigrams]
+        similarity = len(shared) / float(len(token_grams))
+        if similarity < MIN_FUZZY_SIMILARITY:
+            return 0.0
+        return max(shared) * FUZZY * similarity
+
+
+class ContainerMatcher():
+    """
+    Scores containers against a free text query using a trigram inverted
+    index to prune candidates. Only containers holding every trigram of every
+    token are scored; the typo tolerant pass over containers sharing some
+    trigrams only runs when the exact pass yields fewer results than needed.
+
+    Structured filters (status, image, label...) are answered by one
+    inverted map per field, so they cost a few set operations whatever the
+    number of containers.
+    """
+
+    def __init__(self):
+        self._documents = {}
+        self._postings = defaultdict(set)
+        # Field -> value -> ids
+        self._filters = defaultdict(lambda: defaultdict(set))
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, container):
+        """ Indexes (or re-indexes) a container """
+        self.remove(container.id)
+        document = SearchDocument(container)
+        self._documents[container.id] = document
+        for gram in document.trigrams:
+            self._postings[gram].add(container.id)
+        for field, value in document.filter_keys:
+            self._filters[field][value].add(container.id)
+
+    def remove(self, container_id):
+        """ Drops a container from the index """
+        document = self._documents.pop(container_id, None)
+        if document is None:
+            return
+        for gram in document.trigrams:
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(container_id)
+                if not ids:
+                    del self._postings[gram]
+        for field, value in document.filter_keys:
+            values = self._filters.get(field)
+            ids = values.get(value) if values is not None else None
+            if ids is not None:
+                ids.discard(container_id)
+                if not ids:
+                    del values[value]
+
+    def clear(self):
+        """ Empties the index """
+        self._documents = {}
+        self._postings = defaultdict(set)
+        self._filters = defaultdict(lambda: defaultdict(set))
+
+    def filter_ids(self, filters):
+        """
+        Ids of the documents matching every filter
+        Args:
+          filters (list): (field, values) pairs. A document must match one of
+            the values of every field
+        """
+        allowed = None
+        for field, values in filters:
+            index = self._filters.get(field) or {}
+            ids = set()
+            for value in values:
+                if value in index:
+                    ids |= index[value]
+                elif field in PREFIX_FILTERS:
+                    for key, key_ids in index.items():
+                        if key.startswith(value):
+                            ids |= key_ids
+            allowed = ids if allowed is None else allowed & ids
+            if not allowed:
+                break
+        return allowed
+
+    def _candidates(self, tokens, exact):
+        """
+        Ids of the documents that may match every token, or None when a
+        token is too short to use the trigram index
+        """
+        candidates = None
+        for token, grams in tokens:
+            if len(token) < 3:
+                continue
+            postings = [self._postings.get(gram, set()) for gram in grams]
+            if exact:
+                ids = set.intersection(*postings)
+            else:
+                ids = set().union(*postings)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+        return candidates
+
+    def _score(self, tokens, candidates, predicate, results, seen, boost=None):
+        """ Scores the candidates, requiring a match for every token """
+        documents = self._documents
+        for cid in candidates:
+            if cid in seen:
+                continue
+            document = documents.get(cid)
+            if document is None or (predicate and not predicate(cid)):
+                continue
+            seen.add(cid)
+            total = 0.0
+            for token, grams in tokens:
+                score = document.score_token(token, grams)
+                if not score:
+                    break
+                total += score
+            else:
+                if boost is not None:
+                    total += boost(document.name)
+                results.append((total, document.name, cid))
+
+    def rank(self, query, limit=None, predicate=None, with_scores=False,
+             filters=None, boost=None):
+        """
+        Returns the ids of the best matching containers, most relevant
+        first. Every token of the query must match at least one field and the
+        limit is applied after ranking.
+        Args:
+          query (str): The free text query
+          limit (int): Maximum number of ids returned, None for all matches
+          predicate (callable): Optional filter called with a container id
+          with_scores (bool): Return (score, id) tuples instead of ids
+          filters (list): Optional (field, values) pairs, see filter_ids
+          boost (callable): Optional bonus added to the score of a match,
+            called with the lowercase container name
+        """
+        tokens = [(token, trigrams(token)) for token in tokenize(query)]
+        results = []
+        seen = set()
+
+        allowed = self.filter_ids(filters) if filters else None
+        exact = self._candidates(tokens, exact=True)
+        use_fuzzy = exact is not None
+        if allowed is not None:
+            exact = allowed if exact is None else exact & allowed
+        self._score(tokens, self._documents if exact is None else exact,
+                    predicate, results, seen, boost)
+
+        if use_fuzzy and (limit is None or len(results) < limit):
+            fuzzy = self._candidates(tokens, exact=False) or set()
+            if allowed is not None:
+                fuzzy &= allowed
+            self._score(tokens, fuzzy, predicate, results, seen, boost)
+
+        if limit is None:
+            results.sort(key=lambda r: (-r[0], r[1]))
+        else:
+            results = heapq.nsmallest(limit, results,
+                                      key=lambda r: (-r[0], r[1]))
+        if with_scores:
+            return [(score, cid) for score, _, cid in results]
+        return [cid for _, _, cid in results]
@@ -0,0 +1,115 @@
+"""
+Background refreshed, TTL bound snapshots of slow daemon endpoints
+"""
+
+import logging
+import threading
+import time
+
+from dk.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def format_age(seconds):
+    """ Formats a snapshot age for display: "just now", "42s ago", "3m ago" """
+    if seconds is None:
+        return 'never'
+    if seconds < 5:
+        return 'just now'
+    if seconds < 60:
+        return '%ds ago' % seconds
+    if seconds < 3600:
+        return '%dm ago' % (seconds // 60)
+    return '%dh ago' % (seconds // 3600)
+
+
+class CachedSnapshot():
+    """
+    Holds the result of a slow daemon call (df, info...) and refreshes it on
+    a background thread once it is older than the TTL. Readers get the last
+    value instantly and never wait on the daemon unless they ask to.
+    """
+
+    # Seconds before a failed refresh is tried again on access
+    RETRY_DELAY = 10
+
+    def __init__(self, name, fetch, ttl=60):
+        """
+        Args:
+          name (str): Label used in logs
+          fetch (callable): Returns a fresh value, called off the caller thread
+          ttl (int): Seconds after which the value is refreshed on access
+        """
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self.value = None
+        self.updated_at = None
+        self.error = None
+        self._failed_at = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # Set once the first refresh completed, successfully or not
+        self._ready = threading.Event()
+
+    @property
+    def age(self):
+        """ Seconds since the last successful refresh, None if never """
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    @property
+    def stale(self):
+        """ Whether the value is missing or older than the TTL """
+        age = self.age
+        return age is None or age > self.ttl
+
+    def get(self, wait=0):
+        """
+        Returns the cached value, scheduling a refresh when stale
+        Args:
+          wait (float): Seconds to wait for the first refresh when no value is cached
+        """
+        stale = self.stale
+        metrics.cache('snapshot.%s' % self.name, not stale)
+        # A failing daemon call is not repeated on every keystroke
+        failed = self._failed_at is not None and time.monotonic() - self._failed_at < self.RETRY_DELAY
+        if stale and not failed:
+            self.refresh()
+        if self.value is None and wait:
+            self._ready.wait(wait)
+        return self.value
+
+    def refresh(self):
+        """ Starts a background refresh unless one is already running """
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh,
+                         name="dk-snapshot-%s" % self.name,
+                         daemon=True).start()
+
+    def invalidate(self):
+        """ Forces the next read to refresh the value """
+        self.updated_at = None
+        self._failed_at = None
+
+    def _refresh(self):
+        try:
+            with metrics.span('snapshot.%s.refresh' % self.name):
+                value = self.fetch()
+            self.value = value
+            self.updated_at = time.monotonic()
+            self.error = None
+            self._failed_at = None
+        except Exception as e:
+            logger.error("Failed to refresh %s snapshot: %s", self.name, e)
+            self.error = e
+            self._failed_at = time.monotonic()
+        finally:
+            self._ready.set()
+            with self._lock:
+                self._refreshing = False
@@ -1,6 +1,5 @@
 """ Container Details """
 
-import docker
 from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
 from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
 from ulauncher.api.shared.action.ExtensionCustomAction import ExtensionCustomAction
@@ -8,7 +7,11 @@ from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
 from ulauncher.api.shared.action.OpenUrlAction import OpenUrlAction
 from ulauncher.api.shared.action.CopyToClipboardAction import CopyToClipboardAction
 from ulauncher.api.shared.action.RunScriptAction import RunScriptAction
+from ulauncher.api.shared.action.SetUserQueryAction import SetUserQueryAction
 from dk.actions import ACTION_START_CONTAINER, ACTION_STOP_CONTAINER, ACTION_RESTART_CONTAINER
+from dk.metrics import timed
+from dk.render_cache import RenderCache
+from dk.views.daemon_status import render_unavailable
 
 
 class ContainerDetailsView():
@@ -16,6 +19,7 @@ class ContainerDetailsView():
 
     def __init__(self, extension):
         self.extension = extension
+        self._items = RenderCache('details', max_entries=64)
 
     def _build_terminal_cmd(self, terminal_prog, command):
         """
@@ -32,21 +36,17 @@ class ContainerDetailsView():
         # Default to -e (gnome-terminal, tilix, alacritty, konsole, xterm, etc)
         return "%s -e %s" % (terminal_prog, command)
 
-    def render(self, container_id):
+    @timed('view.details')
+    def render(self, container_id, host=None):
         """ Show container details """
 
-        if not self.extension.docker_available:
-             return RenderResultListAction([
-                ExtensionResultItem(
-                    icon=self.extension.icon_path,
-                    name='Docker is not running',
-                    description='Please start the Docker Daemon',
-                    on_enter=HideWindowAction())
-            ])
+        docker_host = self.extension.hosts.get(host)
+        if not docker_host.available:
+            return render_unavailable(self.extension)
 
+        import docker
         try:
-            container = self.extension.docker_client.containers.get(
-                container_id)
+            container = docker_host.inspect_cache.get(container_id)
         except docker.errors.NotFound:
             return RenderResultListAction([
                 ExtensionResultItem(icon=self.extension.icon_path,
@@ -57,6 +57,23 @@ class ContainerDetailsView():
             ])
 
         default_terminal = self.extension.preferences["default_terminal"]
+        network_settings = container.attrs['NetworkSettings']
+
+        # PERFORMANCE: Reuse the items of the last render while nothing they
+        # show has changed, skipping the ports parsing and command building
+        key = (docker_host.name, container.id)
+        fingerprint = (container.name, container.status, container.attrs['Config']['Image'],
+                       network_settings.get('Ports'), network_settings.get('IPAddress'),
+                       network_settings.get('Networks'), default_terminal,
+                       docker_host.cli_prefix, self.extension.logs_view.keyword)
+        items = self._items.get(key, fingerprint)
+        if items is None:
+            items = self._items.put(key, fingerprint,
+                                    self._render_items(container, docker_host, default_terminal))
+        return RenderResultListAction(list(items))
+
+    def _render_items(self, container, docker_host, default_terminal):
+        """ Builds the detail items of an inspected container """
         items = []
 
         attrs = container.attrs
@@ -98,7 +115,8 @@ class ContainerDetailsView():
                     highlightable=False,
                     on_enter=ExtensionCustomAction({
                         'action': ACTION_START_CONTAINER,
-                        'id': container.short_id
+                        'id': container.id,
+                        'host': docker_host.name
                     })))
 
         if container.status == 'running':
@@ -124,7 +142,8 @@ class ContainerDetailsView():
             # --- SENSEI MOD: Shell Command ---
             # SANITIZED: Use shlex.quote to prevent command injection
             import shlex
-            shell_cmd_str = "docker exec -it %s sh" % shlex.quote(container.short_id)
+            shell_cmd_str = "%s exec -it %s sh" % (docker_host.cli_prefix,
+                                                   shlex.quote(container.short_id))
             final_shell_cmd = self._build_terminal_cmd(default_terminal, shell_cmd_str)
 
             items.append(
@@ -144,7 +163,9 @@ class ContainerDetailsView():
                                         'action':
                                         ACTION_STOP_CONTAINER,
                                         'id':
-                                        container.short_id
+                                        container.id,
+                                        'host':
+                                        docker_host.name
                                     })))
 
             items.append(
@@ -156,19 +177,26 @@ class ContainerDetailsView():
                                         'action':
                                         ACTION_RESTART_CONTAINER,
                                         'id':
-                                        container.short_id
+                                        container.id,
+                                        'host':
+                                        docker_host.name
                                     })))
-            
-            # SANITIZED: Use shlex.quote to prevent command injection
-            import shlex
-            logs_cmd_str = "docker logs -f %s" % shlex.quote(container.short_id)
-            final_logs_cmd = self._build_terminal_cmd(default_terminal, logs_cmd_str)
 
-            items.append(
-                ExtensionResultItem(icon='images/icon_logs.png',
-                                    name="Logs",
-                                    description="Show logs of the container",
-                                    highlightable=False,
-                                    on_enter=RunScriptAction(final_logs_cmd, [])))
+        # SANITIZED: Use shlex.quote to prevent command injection
+        import shlex
+        logs_cmd_str = "%s logs -f %s" % (docker_host.cli_prefix,
+                                          shlex.quote(container.short_id))
+        final_logs_cmd = self._build_terminal_cmd(default_terminal, logs_cmd_str)
+
+        # PERFORMANCE: Tail the logs in the launcher, the terminal is one Alt+Enter away
+        items.append(
+            ExtensionResultItem(icon='images/icon_logs.png',
+                                name="Logs",
+                                description="Show the last lines here (Alt+Enter: follow in %s)" %
+                                default_terminal,
+                                highlightable=False,
+                                on_enter=SetUserQueryAction(
+                                    self.extension.logs_view.query_for(container)),
+                                on_alt_enter=RunScriptAction(final_logs_cmd, [])))
 
-        return RenderResultListAction(items)
\ No newline at end of file
+        return items
\ No newline at end of file
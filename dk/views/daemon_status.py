@@ -0,0 +1,17 @@
+""" Daemon connection status shared by the views """
+
+from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
+from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
+from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
+
+
+def render_unavailable(extension):
+    """ Renders the connection health when the Docker daemon is not reachable """
+    name, description = extension.connection.status()
+    return RenderResultListAction([
+        ExtensionResultItem(
+            icon=extension.icon_path,
+            name=name,
+            description=description,
+            on_enter=HideWindowAction())
+    ])
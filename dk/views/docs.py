@@ -0,0 +1,49 @@
+""" Docker documentation search """
+
+from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
+from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
+from ulauncher.api.shared.action.OpenUrlAction import OpenUrlAction
+from ulauncher.api.shared.action.CopyToClipboardAction import CopyToClipboardAction
+from dk.docs_index import DocsIndex
+from dk.metrics import timed
+
+# Maximum number of reference pages suggested
+MAX_SUGGESTIONS = 8
+
+
+class DocsView():
+    """ Suggests CLI reference pages from the offline index as the user types """
+
+    def __init__(self, extension):
+        self.extension = extension
+        self.index = DocsIndex()
+
+    @timed('view.docs')
+    def render(self, query):
+        """
+        Args:
+          query (str): A command, a flag or both ("run -p", "compose up")
+        """
+        query = query or ""
+        items = []
+        for entry in self.index.search(query, limit=MAX_SUGGESTIONS):
+            command = 'docker %s' % entry.path
+            if entry.flag:
+                command = '%s %s' % (command, entry.flag)
+            items.append(
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name=entry.title,
+                                    description=entry.summary,
+                                    on_enter=OpenUrlAction(entry.url),
+                                    on_alt_enter=CopyToClipboardAction(command)))
+
+        # The full text search of the site stays one Enter away
+        items.append(
+            ExtensionResultItem(
+                icon=self.extension.icon_path,
+                name="Press enter to search for %s" % query,
+                description="Full text search on docs.docker.com",
+                highlightable=False,
+                on_enter=OpenUrlAction("https://docs.docker.com/search/?q=%s" %
+                                       str(query))))
+        return RenderResultListAction(items)
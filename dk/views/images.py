@@ -0,0 +1,213 @@
+""" Images by size and age """
+
+from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
+from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
+from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
+from ulauncher.api.shared.action.ExtensionCustomAction import ExtensionCustomAction
+from ulauncher.api.shared.action.CopyToClipboardAction import CopyToClipboardAction
+from dk.actions import ACTION_IMAGE_DETAILS, ACTION_IMAGE_PULL, ACTION_IMAGE_REMOVE
+from dk.disk_usage import format_bytes
+from dk.images import format_created
+from dk.metrics import timed
+from dk.views.daemon_status import render_unavailable
+
+# First query word that selects the order: (key, largest or newest first)
+SORT_KEYS = {
+    'size': (lambda i: i.size, True),
+    'new': (lambda i: i.created, True),
+    'old': (lambda i: i.created, False),
+}
+
+# Query words that only keep some of the images
+FILTER_WORDS = {
+    'dangling': lambda image, used: image.dangling,
+    'unused': lambda image, used: not used,
+}
+
+# Maximum number of images listed
+MAX_IMAGES = 10
+
+# Seconds to wait for the first image list before rendering a placeholder
+IMAGES_WAIT = 0.5
+
+
+def describe(image, used_by):
+    """ One line summary: "1.2GB | 3 weeks ago | used by api, worker" """
+    parts = [format_bytes(image.size), format_created(image.created)]
+    if len(image.tags) > 1:
+        parts.append('+%d tags' % (len(image.tags) - 1))
+    if used_by:
+        parts.append('used by %s' % ', '.join(used_by[:3]) + (', ...' if len(used_by) > 3 else ''))
+    else:
+        parts.append('dangling' if image.dangling else 'unused')
+    return ' | '.join(parts)
+
+
+class ImagesView():
+    """ Lists the images of every host from the cached image list """
+
+    def __init__(self, extension):
+        self.extension = extension
+
+    @timed('view.images')
+    def render(self, query):
+        """
+        Never calls the daemon: the image list is refreshed in the background
+        and sorted and filtered here
+        Args:
+          query (str): Optional order (size, new, old), then dangling or
+            unused, then words matched against the tags and id
+        """
+        hosts = self.extension.hosts
+        if not hosts.primary.available and not hosts.connected:
+            return render_unavailable(self.extension)
+
+        words = (query or "").lower().split()
+        sort_key, reverse = SORT_KEYS['size']
+        if words and words[0] in SORT_KEYS:
+            sort_key, reverse = SORT_KEYS[words.pop(0)]
+        filters = [FILTER_WORDS[w] for w in words if w in FILTER_WORDS]
+        needle = ' '.join(w for w in words if w not in FILTER_WORDS)
+
+        images = []
+        usage = {}
+        loading = False
+        errors = []
+        for host in hosts:
+            if host.images is None:
+                continue
+            host_images = host.images.get(wait=IMAGES_WAIT)
+            if host_images is None:
+                if host.images.error is not None:
+                    errors.append((host, host.images.error))
+                else:
+                    loading = True
+                continue
+            for image in host_images:
+                used_by = host.image_usage.get(image.id)
+                usage[(host.name, image.id)] = used_by
+                if all(f(image, used_by) for f in filters):
+                    images.append(image)
+
+        if needle:
+            images = [i for i in images
+                      if needle in i.short_id or any(needle in t.lower() for t in i.tags)]
+
+        failures = [
+            ExtensionResultItem(icon=self.extension.icon_path,
+                                name='Failed to list images' + (' @ %s' % host.name if len(hosts) > 1 else ''),
+                                description=str(error),
+                                highlightable=False,
+                                on_enter=HideWindowAction())
+            for host, error in errors
+        ]
+
+        if not images:
+            if failures and not loading:
+                return RenderResultListAction(failures)
+            name = 'Loading images...' if loading else 'No images found'
+            if query and not loading:
+                name = 'No images found that match: {}'.format(query)
+            return RenderResultListAction([
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name=name,
+                                    highlightable=False,
+                                    on_enter=HideWindowAction())
+            ] + failures)
+
+        images.sort(key=sort_key, reverse=reverse)
+
+        items = [
+            ExtensionResultItem(icon=self.extension.icon_path,
+                                name='%d images, %s' % (len(images),
+                                                        format_bytes(sum(i.size for i in images))),
+                                description='Order with size, new or old; keep dangling or unused ones',
+                                highlightable=False,
+                                on_enter=HideWindowAction())
+        ]
+        for image in images[:MAX_IMAGES]:
+            name = image.name
+            if len(hosts) > 1:
+                name = '%s @ %s' % (name, image.host)
+            items.append(
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name=name,
+                                    description=describe(image, usage[(image.host, image.id)]),
+                                    on_enter=ExtensionCustomAction(
+                                        {
+                                            'action': ACTION_IMAGE_DETAILS,
+                                            'image_id': image.id,
+                                            'host': image.host
+                                        },
+                                        keep_app_open=True)))
+        # Hosts whose image list failed are reported below the others
+        items.extend(failures)
+        return RenderResultListAction(items)
+
+    @timed('view.image')
+    def render_image(self, image_id, host=None):
+        """
+        Shows the actions of an image
+        Args:
+          image_id (str): The full image id
+          host (str): The name of the daemon holding the image
+        """
+        docker_host = self.extension.hosts.get(host)
+        images = docker_host.images.value if docker_host.images is not None else None
+        image = next((i for i in images or () if i.id == image_id), None)
+        if image is None:
+            return RenderResultListAction([
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name='Image %s not found' % image_id,
+                                    highlightable=False,
+                                    on_enter=HideWindowAction())
+            ])
+
+        used_by = docker_host.image_usage.get(image.id)
+        items = [
+            ExtensionResultItem(icon=self.extension.icon_path,
+                                name=image.name,
+                                description=describe(image, used_by),
+                                highlightable=False,
+                                on_enter=CopyToClipboardAction(image.id))
+        ]
+
+        for tag in image.tags[:3]:
+            items.append(
+                ExtensionResultItem(icon='images/icon_restart.png',
+                                    name='Pull %s' % tag,
+                                    description='Download the latest %s in the background' % tag,
+                                    highlightable=False,
+                                    on_enter=ExtensionCustomAction({
+                                        'action': ACTION_IMAGE_PULL,
+                                        'reference': tag,
+                                        'host': docker_host.name
+                                    })))
+
+        if used_by:
+            items.append(
+                ExtensionResultItem(icon='images/icon_stop.png',
+                                    name='In use by %d container(s)' % len(used_by),
+                                    description='Remove %s before removing the image' % ', '.join(used_by),
+                                    highlightable=False,
+                                    on_enter=HideWindowAction()))
+        else:
+            # One item per tag: removing a tag only deletes the image with
+            # its last tag, dangling images are removed by id
+            for reference in image.tags[:3] or [image.id]:
+                if len(image.tags) > 1:
+                    description = 'Untag %s, the image stays for its other tags' % reference
+                else:
+                    description = 'Remove %s and free up to %s in the background' % (
+                        image.name, format_bytes(image.size))
+                items.append(
+                    ExtensionResultItem(icon='images/icon_stop.png',
+                                        name='Remove %s' % (reference if image.tags else 'image'),
+                                        description=description,
+                                        highlightable=False,
+                                        on_enter=ExtensionCustomAction({
+                                            'action': ACTION_IMAGE_REMOVE,
+                                            'reference': reference,
+                                            'host': docker_host.name
+                                        })))
+        return RenderResultListAction(items)
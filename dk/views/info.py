@@ -5,6 +5,14 @@ from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
 from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
 from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
 from ulauncher.api.shared.action.OpenUrlAction import OpenUrlAction
+from dk.disk_usage import (CATEGORY_BUILD_CACHE, CATEGORY_IMAGES,
+                           CATEGORY_VOLUMES, format_bytes)
+from dk.metrics import timed
+from dk.snapshot import format_age
+from dk.views.daemon_status import render_unavailable
+
+# Seconds to wait for the first info() snapshot
+INFO_WAIT = 0.5
 
 
 class InfoView():
@@ -13,26 +21,77 @@ class InfoView():
     def __init__(self, extension):
         self.extension = extension
 
+    @timed('view.info')
     def render(self):
         """ Show docker info """
-        if not self.extension.docker_available:
-             return RenderResultListAction([
-                ExtensionResultItem(
-                    icon='images/icon.png',
-                    name='Docker is not running',
-                    description='Please start the Docker Daemon',
-                    on_enter=HideWindowAction())
-            ])
+        host = self.extension.hosts.primary
+        if not host.available:
+            return render_unavailable(self.extension)
 
-        info = self.extension.docker_client.version()
+        # PERFORMANCE: Served from background refreshed snapshots, info() only
+        # blocks briefly the very first time and df() never does
+        info = host.system_info.get(wait=INFO_WAIT)
+        usage = host.disk_usage.get()
 
         items = []
-        data = [
-            {
-                'name': 'Docker Version',
-                'description': info['Version'],
+        data = []
+        if info is None and host.system_info.error is not None:
+            data.append({
+                'name': 'Failed to read Docker information',
+                'description': str(host.system_info.error),
                 'action': HideWindowAction()
-            },
+            })
+        elif info is None:
+            data.append({
+                'name': 'Loading Docker information...',
+                'description': 'Waiting for the Docker Daemon',
+                'action': HideWindowAction()
+            })
+        else:
+            data.extend([
+                {
+                    'name': 'Docker %s' % info.get('ServerVersion', 'unknown'),
+                    'description': '%s, storage driver %s (updated %s)' % (
+                        info.get('OperatingSystem', 'Unknown OS'),
+                        info.get('Driver', 'unknown'),
+                        format_age(host.system_info.age)),
+                    'action': HideWindowAction()
+                },
+                {
+                    'name': 'Containers: %d' % info.get('Containers', 0),
+                    'description': '%d running, %d stopped, %d paused' % (
+                        info.get('ContainersRunning', 0),
+                        info.get('ContainersStopped', 0),
+                        info.get('ContainersPaused', 0)),
+                    'action': HideWindowAction()
+                },
+                {
+                    'name': 'Resources',
+                    'description': '%d CPUs, %s memory' % (
+                        info.get('NCPU', 0), format_bytes(info.get('MemTotal', 0))),
+                    'action': HideWindowAction()
+                },
+            ])
+
+        if usage is None:
+            error = host.disk_usage.error
+            data.append({
+                'name': 'Disk usage',
+                'description': 'Failed to calculate: %s' % error if error is not None else 'Calculating...',
+                'action': HideWindowAction()
+            })
+        else:
+            data.append({
+                'name': 'Disk usage',
+                'description': 'Images %s, volumes %s, build cache %s (updated %s)' % (
+                    format_bytes(usage.sizes.get(CATEGORY_IMAGES)),
+                    format_bytes(usage.sizes.get(CATEGORY_VOLUMES)),
+                    format_bytes(usage.sizes.get(CATEGORY_BUILD_CACHE)),
+                    format_age(host.disk_usage.age)),
+                'action': HideWindowAction()
+            })
+
+        data.extend([
             {
                 'name': 'Documentation',
                 'description': 'Open Docker documentation',
@@ -47,7 +106,7 @@ class InfoView():
                 OpenUrlAction(
                     "https://list.community/veggiemonk/awesome-docker")
             },
-        ]
+        ])
 
         for item in data:
             items.append(
@@ -4,7 +4,14 @@ from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
 from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
 from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
 from ulauncher.api.shared.action.ExtensionCustomAction import ExtensionCustomAction
-from dk.actions import ACTION_DETAIL_CONTAINER
+from dk.actions import ACTION_DETAIL_CONTAINER, ACTION_BULK_START, ACTION_BULK_STOP, ACTION_BULK_RESTART
+from dk.metrics import timed
+from dk.query import parse_query
+from dk.render_cache import RenderCache
+from dk.views.daemon_status import render_unavailable
+
+# Number of top ranked results inspected ahead of time
+PREFETCH_COUNT = 3
 
 
 class ListContainersView():
@@ -12,61 +19,112 @@ class ListContainersView():
 
     def __init__(self, extension):
         self.extension = extension
+        self._items = RenderCache('list')
 
+    @timed('view.list')
     def render(self, query, only_running=True):
-        """ Lists the Containers """
+        """
+        Lists the Containers
+        Args:
+          query (str|ContainerQuery): Free text and structured filters
+          only_running (bool): Hide stopped containers unless the query
+            filters on the status
+        """
+        query = parse_query(query)
+        hosts = self.extension.hosts
+        superseded = self.extension.queries.superseded
+        containers = hosts.search(query, only_running=only_running, limit=8,
+                                  cancelled=superseded,
+                                  boost=self.extension.frecency.booster())
 
-        if not self.extension.docker_available:
-             return RenderResultListAction([
-                ExtensionResultItem(
-                    icon=self.extension.icon_path,
-                    name='Docker is not running',
-                    description='Please start the Docker Daemon',
-                    on_enter=HideWindowAction())
-            ])
+        # PERFORMANCE: A newer query is waiting, its results are all that matter
+        if superseded():
+            return None
+
+        if not containers and not hosts.connected:
+            return render_unavailable(self.extension)
 
-        filters = {}
-        
-        # SANITIZED: Validate and sanitize query to prevent command injection
-        if query:
-            import re
-            # Only allow alphanumeric, hyphens, underscores, and dots
-            if not re.match(r'^[a-zA-Z0-9._-]+$', query):
-                # Reject malicious queries
-                return RenderResultListAction([
-                    ExtensionResultItem(
-                        icon=self.extension.icon_path,
-                        name='Invalid container name',
-                        description='Container names can only contain letters, numbers, hyphens, underscores, and dots',
-                        on_enter=HideWindowAction())
-                ])
-            filters["name"] = query
-
-        if only_running:
-            filters["status"] = "running"
-
-        containers = self.extension.docker_client.containers.list(
-            filters=filters, limit=8)
-
-        if not containers:
+        bulk_items = self._bulk_items(hosts, query) if query.raw.strip() else []
+
+        if not containers and not bulk_items:
             return RenderResultListAction([
                 ExtensionResultItem(
                     icon=self.extension.icon_path,
-                    name='No containers found that match: {}'.format(query),
+                    name='No containers found that match: {}'.format(query.raw),
                     on_enter=HideWindowAction())
             ])
 
+        # PERFORMANCE: Warm the inspect cache for the likely next details view
+        for container in containers[:PREFETCH_COUNT]:
+            inspect_cache = hosts.get(container.host).inspect_cache
+            if inspect_cache is not None:
+                inspect_cache.prefetch([container.id])
+
+        multi_host = len(hosts) > 1
         items = []
         for container in containers:
-            items.append(
-                ExtensionResultItem(icon=self.extension.icon_path,
-                                    name=container.name,
-                                    description=container.status,
-                                    on_enter=ExtensionCustomAction(
-                                        {
-                                            'action': ACTION_DETAIL_CONTAINER,
-                                            'container_id': container.id
-                                        },
-                                        keep_app_open=True)))
+            cached = hosts.get(container.host).cached
+            # PERFORMANCE: Unchanged containers reuse the item of the last render
+            key = (container.host, container.id)
+            # The uptime of running containers is not shown, so it is left out
+            state_text = container.state_text if container.status != 'running' else None
+            fingerprint = (container.name, container.status, state_text, multi_host, cached)
+            item = self._items.get(key, fingerprint)
+            if item is None:
+                item = self._items.put(key, fingerprint,
+                                       self._container_item(container, multi_host, cached))
+            items.append(item)
+
+        items.extend(bulk_items)
 
         return RenderResultListAction(items)
+
+    def _container_item(self, container, multi_host, cached):
+        """ The list item of a container, opening its details """
+        description = container.status
+        if container.status != 'running':
+            description = container.state_text or container.status
+        if multi_host:
+            description = '%s @ %s' % (description, container.host)
+        if cached:
+            # From the last session, the daemon has not answered yet
+            description += ' (cached)'
+        return ExtensionResultItem(icon=self.extension.icon_path,
+                                   name=container.name,
+                                   description=description,
+                                   on_enter=ExtensionCustomAction(
+                                       {
+                                           'action': ACTION_DETAIL_CONTAINER,
+                                           'container_id': container.id,
+                                           'host': container.host
+                                       },
+                                       keep_app_open=True))
+
+    def _bulk_items(self, hosts, query):
+        """ Items to start/stop/restart every container matching the query """
+        matches = hosts.search(query, only_running=False, limit=None,
+                               cancelled=self.extension.queries.superseded)
+        running = [c for c in matches if c.status == 'running']
+        stopped = [c for c in matches if c.status != 'running']
+
+        items = []
+        for icon, label, action, targets in (
+            ('images/icon_stop.png', 'Stop', ACTION_BULK_STOP, running),
+            ('images/icon_restart.png', 'Restart', ACTION_BULK_RESTART, running),
+            ('images/icon_start.png', 'Start', ACTION_BULK_START, stopped),
+        ):
+            if len(targets) < 2:
+                continue
+            names = ', '.join(c.name for c in targets[:5])
+            if len(targets) > 5:
+                names += ', ...'
+            items.append(
+                ExtensionResultItem(icon=icon,
+                                    name='%s all %d matching containers' % (label, len(targets)),
+                                    description=names,
+                                    highlightable=False,
+                                    on_enter=ExtensionCustomAction({
+                                        'action': action,
+                                        'targets': [[c.host, c.id] for c in targets]
+                                    })))
+        return items
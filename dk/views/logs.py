@@ -0,0 +1,122 @@
+""" Container logs tailed inside the launcher """
+
+import time
+
+from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
+from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
+from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
+from ulauncher.api.shared.action.CopyToClipboardAction import CopyToClipboardAction
+from ulauncher.api.shared.action.SetUserQueryAction import SetUserQueryAction
+from dk.metrics import timed
+from dk.query import ContainerQuery
+from dk.views.daemon_status import render_unavailable
+
+# Seconds to wait for the first lines of a newly opened tail
+LOG_WAIT = 0.5
+
+# Lines shown, newest first
+MAX_LINES = 20
+
+
+class LogsView():
+    """
+    Shows the last lines of a container. The first query word selects the
+    container, the following ones filter the lines.
+    """
+
+    def __init__(self, extension):
+        self.extension = extension
+
+    @property
+    def keyword(self):
+        """ The keyword of this view, used to switch to a container """
+        return self.extension.preferences.get('kw_logs') or 'dk:logs'
+
+    def query_for(self, container):
+        """ The user query showing the logs of a container """
+        return '%s %s ' % (self.keyword, container.name)
+
+    @timed('view.logs')
+    def render(self, query):
+        """
+        Args:
+          query (str): Container name or id, followed by words to look for
+        """
+        hosts = self.extension.hosts
+        if not hosts.primary.available and not hosts.connected:
+            return render_unavailable(self.extension)
+
+        words = (query or "").split()
+        if not words:
+            return self._pick_container('')
+
+        container = self._find(words[0])
+        if container is None:
+            return self._pick_container(words[0])
+
+        docker_host = hosts.get(container.host)
+        if docker_host.logs is None:
+            return render_unavailable(self.extension)
+
+        buffer = docker_host.logs.get(container.id)
+        if not buffer.lines:
+            buffer.wait(LOG_WAIT)
+
+        needles = [word.lower() for word in words[1:]]
+        lines = buffer.search(needles, limit=MAX_LINES)
+
+        if not lines:
+            if buffer.error is not None:
+                name = 'Failed to read the logs of %s' % container.name
+            elif buffer.following and not buffer.lines:
+                name = 'Waiting for the logs of %s...' % container.name
+            else:
+                name = 'No log lines of %s match' % container.name
+            return RenderResultListAction([
+                ExtensionResultItem(icon='images/icon_logs.png',
+                                    name=name,
+                                    description='%d lines buffered' % len(buffer.lines),
+                                    highlightable=False,
+                                    on_enter=HideWindowAction())
+            ])
+
+        items = []
+        for timestamp, text in lines:
+            description = container.name
+            if timestamp is not None:
+                description = '%s  %s' % (time.strftime('%H:%M:%S', time.localtime(timestamp)),
+                                          container.name)
+            items.append(
+                ExtensionResultItem(icon='images/icon_logs.png',
+                                    name=text,
+                                    description=description,
+                                    highlightable=False,
+                                    on_enter=CopyToClipboardAction(text)))
+        return RenderResultListAction(items)
+
+    def _find(self, ref):
+        """ The container named ref, or whose id starts with it """
+        query = ContainerQuery(ref, ref, any_status=True)
+        for container in self.extension.hosts.search(query, limit=None):
+            if container.name == ref or container.id.startswith(ref):
+                return container
+        return None
+
+    def _pick_container(self, text):
+        """ Lists the containers matching text, selecting one shows its logs """
+        containers = self.extension.hosts.search(ContainerQuery(text, text, any_status=True),
+                                                 limit=8)
+        if not containers:
+            return RenderResultListAction([
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name='No containers found that match: {}'.format(text),
+                                    on_enter=HideWindowAction())
+            ])
+
+        return RenderResultListAction([
+            ExtensionResultItem(icon='images/icon_logs.png',
+                                name=container.name,
+                                description='Show the logs of this container (%s)' % container.status,
+                                on_enter=SetUserQueryAction(self.query_for(container)))
+            for container in containers
+        ])
@@ -0,0 +1,143 @@
+""" Compose projects """
+
+from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
+from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
+from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
+from ulauncher.api.shared.action.ExtensionCustomAction import ExtensionCustomAction
+from dk.actions import (ACTION_DETAIL_CONTAINER, ACTION_PROJECT_DETAILS,
+                        ACTION_PROJECT_RESTART, ACTION_PROJECT_START,
+                        ACTION_PROJECT_STOP)
+from dk.metrics import timed
+from dk.projects import HEALTHY, STARTING, UNHEALTHY
+from dk.views.daemon_status import render_unavailable
+
+# Maximum number of projects listed
+MAX_PROJECTS = 10
+
+
+def describe(project):
+    """ One line summary: "3/5 running | 1 unhealthy | api, db, worker" """
+    parts = ['%d/%d running' % (project.running, len(project.containers))]
+    health = project.health_counts()
+    for state in (UNHEALTHY, STARTING, HEALTHY):
+        if health.get(state):
+            parts.append('%d %s' % (health[state], state))
+    parts.append(', '.join(project.services))
+    return ' | '.join(parts)
+
+
+class ProjectsView():
+    """ Lists the compose projects of every host and acts on whole projects """
+
+    def __init__(self, extension):
+        self.extension = extension
+
+    @timed('view.projects')
+    def render(self, query):
+        """
+        Args:
+          query (str): Optional filter on the project names
+        """
+        hosts = self.extension.hosts
+        if not hosts.primary.available and not hosts.connected:
+            return render_unavailable(self.extension)
+
+        needle = (query or "").strip().lower()
+        projects = []
+        syncing = False
+        for host in hosts:
+            if not host.index.ready:
+                syncing = True
+            projects.extend(p for p in host.projects.all() if needle in p.name.lower())
+
+        if not projects:
+            name = 'Loading containers...' if syncing else 'No compose projects found'
+            if needle and not syncing:
+                name = 'No compose projects found that match: {}'.format(query)
+            return RenderResultListAction([
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name=name,
+                                    highlightable=False,
+                                    on_enter=HideWindowAction())
+            ])
+
+        # Projects with running containers first
+        projects.sort(key=lambda p: (not p.running, p.name))
+
+        items = []
+        for project in projects[:MAX_PROJECTS]:
+            name = project.name
+            if len(hosts) > 1:
+                name = '%s @ %s' % (name, project.host)
+            items.append(
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name=name,
+                                    description=describe(project),
+                                    on_enter=ExtensionCustomAction(
+                                        {
+                                            'action': ACTION_PROJECT_DETAILS,
+                                            'project': project.name,
+                                            'host': project.host
+                                        },
+                                        keep_app_open=True)))
+        return RenderResultListAction(items)
+
+    @timed('view.project')
+    def render_project(self, name, host=None):
+        """
+        Shows the actions and the containers of a project
+        Args:
+          name (str): The compose project name
+          host (str): The name of the daemon running the project
+        """
+        docker_host = self.extension.hosts.get(host)
+        project = docker_host.projects.get(name)
+        if project is None:
+            return RenderResultListAction([
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name='Compose project %s not found' % name,
+                                    highlightable=False,
+                                    on_enter=HideWindowAction())
+            ])
+
+        items = [
+            ExtensionResultItem(icon=self.extension.icon_path,
+                                name=project.name,
+                                description=describe(project),
+                                highlightable=False,
+                                on_enter=HideWindowAction())
+        ]
+
+        actions = []
+        if project.running < len(project.containers):
+            actions.append(('images/icon_start.png', 'Start', ACTION_PROJECT_START))
+        if project.running:
+            actions.append(('images/icon_stop.png', 'Stop', ACTION_PROJECT_STOP))
+            actions.append(('images/icon_restart.png', 'Restart', ACTION_PROJECT_RESTART))
+        for icon, label, action in actions:
+            items.append(
+                ExtensionResultItem(icon=icon,
+                                    name='%s project' % label,
+                                    description='%s the %d containers of %s in dependency order' % (
+                                        label, len(project.containers), project.name),
+                                    highlightable=False,
+                                    on_enter=ExtensionCustomAction({
+                                        'action': action,
+                                        'project': project.name,
+                                        'host': docker_host.name
+                                    })))
+
+        for container in project.containers:
+            items.append(
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name=container.name,
+                                    description=container.state_text or container.status,
+                                    highlightable=False,
+                                    on_enter=ExtensionCustomAction(
+                                        {
+                                            'action': ACTION_DETAIL_CONTAINER,
+                                            'container_id': container.id,
+                                            'host': container.host
+                                        },
+                                        keep_app_open=True)))
+        return RenderResultListAction(items)
@@ -0,0 +1,72 @@
+""" Prune preview """
+
+from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
+from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
+from ulauncher.api.shared.action.ExtensionCustomAction import ExtensionCustomAction
+from dk.actions import ACTION_PRUNE
+from dk.disk_usage import (CATEGORY_LABELS, CATEGORY_VOLUMES, SYSTEM_PRUNE,
+                           format_bytes)
+from dk.metrics import timed
+from dk.views.daemon_status import render_unavailable
+
+# Seconds to wait for the first df() result before rendering without sizes
+PREVIEW_WAIT = 0.5
+
+
+class PruneView():
+    """ Shows how much space each prune category would free """
+
+    def __init__(self, extension):
+        self.extension = extension
+
+    @timed('view.prune')
+    def render(self):
+        """ Show the prune preview """
+        host = self.extension.hosts.primary
+        if not host.available:
+            return render_unavailable(self.extension)
+
+        usage = host.disk_usage.get(wait=PREVIEW_WAIT)
+
+        if usage is None and host.disk_usage.error is not None:
+            description = 'Failed to calculate reclaimable space: %s' % host.disk_usage.error
+        elif usage is None:
+            description = 'Calculating reclaimable space...'
+        else:
+            description = '%s reclaimable from containers, images, networks and build cache' % (
+                format_bytes(usage.total()))
+
+        items = [
+            ExtensionResultItem(icon=self.extension.icon_path,
+                                name='Prune unused data',
+                                description=description,
+                                highlightable=False,
+                                on_enter=ExtensionCustomAction({
+                                    'action': ACTION_PRUNE,
+                                    'categories': list(SYSTEM_PRUNE)
+                                }))
+        ]
+
+        for category, label in CATEGORY_LABELS.items():
+            if usage is None:
+                description = 'Size unknown'
+            elif category in usage.counts and usage.counts[category]:
+                description = '%s reclaimable (%d)' % (
+                    format_bytes(usage.reclaimable[category]), usage.counts[category])
+            else:
+                description = 'Nothing to reclaim'
+
+            if category == CATEGORY_VOLUMES:
+                description += ' - deletes volume data'
+
+            items.append(
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name='Prune %s' % label.lower(),
+                                    description=description,
+                                    highlightable=False,
+                                    on_enter=ExtensionCustomAction({
+                                        'action': ACTION_PRUNE,
+                                        'categories': [category]
+                                    })))
+
+        return RenderResultListAction(items)
@@ -0,0 +1,66 @@
+""" Diagnostics: hot path latencies and cache hit rates """
+
+from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
+from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
+from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
+from ulauncher.api.shared.action.ExtensionCustomAction import ExtensionCustomAction
+from dk.actions import ACTION_METRICS_DUMP
+from dk.metrics import DUMP_FILE, metrics
+
+# Maximum number of spans listed, slowest overall first
+MAX_SPANS = 12
+
+
+class StatsView():
+    """ Lists the recorded timing spans and cache hit rates """
+
+    def __init__(self, extension):
+        self.extension = extension
+
+    def render(self, query):
+        """
+        Args:
+          query (str): Optional filter on the span and cache names
+        """
+        if not metrics.enabled:
+            return RenderResultListAction([
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name='Diagnostics are disabled',
+                                    description='Set "Diagnostics" in the extension preferences to record timings',
+                                    highlightable=False,
+                                    on_enter=HideWindowAction())
+            ])
+
+        needle = (query or "").strip().lower()
+        snapshot = metrics.snapshot()
+
+        items = [
+            ExtensionResultItem(icon=self.extension.icon_path,
+                                name='Write a JSON dump',
+                                description='Recorded over %ds, saved as %s in the cache directory' % (
+                                    snapshot['uptime_s'], DUMP_FILE),
+                                highlightable=False,
+                                on_enter=ExtensionCustomAction({'action': ACTION_METRICS_DUMP}))
+        ]
+
+        for name, cache in sorted(snapshot['caches'].items()):
+            if needle in name:
+                items.append(
+                    ExtensionResultItem(icon=self.extension.icon_path,
+                                        name='Cache %s: %.1f%% hits' % (name, cache['hit_rate'] * 100),
+                                        description='%d hits, %d misses' % (cache['hits'], cache['misses']),
+                                        highlightable=False,
+                                        on_enter=HideWindowAction()))
+
+        spans = [(name, span) for name, span in snapshot['spans'].items() if needle in name]
+        spans.sort(key=lambda s: -s[1]['total_ms'])
+        for name, span in spans[:MAX_SPANS]:
+            items.append(
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name='%s  (%d calls)' % (name, span['count']),
+                                    description='p50 %.2fms | p95 %.2fms | p99 %.2fms | max %.2fms' % (
+                                        span['p50_ms'], span['p95_ms'], span['p99_ms'], span['max_ms']),
+                                    highlightable=False,
+                                    on_enter=HideWindowAction()))
+
+        return RenderResultListAction(items)
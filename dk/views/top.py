@@ -0,0 +1,88 @@
+""" Live resource usage of the running containers """
+
+from ulauncher.api.shared.item.ExtensionResultItem import ExtensionResultItem
+from ulauncher.api.shared.action.RenderResultListAction import RenderResultListAction
+from ulauncher.api.shared.action.HideWindowAction import HideWindowAction
+from ulauncher.api.shared.action.ExtensionCustomAction import ExtensionCustomAction
+from dk.actions import ACTION_DETAIL_CONTAINER
+from dk.disk_usage import format_bytes
+from dk.metrics import timed
+from dk.views.daemon_status import render_unavailable
+
+# First query word that selects the sort order
+SORT_KEYS = {
+    'cpu': lambda s: s.cpu_percent,
+    'mem': lambda s: s.mem_usage,
+    'net': lambda s: s.net_rate,
+    'io': lambda s: s.io_rate,
+}
+
+
+class TopView():
+    """ Lists running containers by CPU, memory, network or IO usage """
+
+    def __init__(self, extension):
+        self.extension = extension
+
+    @timed('view.top')
+    def render(self, query):
+        """
+        Show the latest resource samples. Never waits on stats() calls: the
+        samplers run in the background while this view is being used.
+        Args:
+          query (str): Optional sort key (cpu, mem, net, io) followed by a
+            container name filter
+        """
+        hosts = self.extension.hosts
+        if not hosts.primary.available and not hosts.connected:
+            return render_unavailable(self.extension)
+
+        words = (query or "").lower().split()
+        sort_key = SORT_KEYS['cpu']
+        if words and words[0] in SORT_KEYS:
+            sort_key = SORT_KEYS[words.pop(0)]
+        needle = ' '.join(words)
+
+        stats = []
+        for host in hosts:
+            if host.stats_sampler is None:
+                continue
+            host.stats_sampler.touch()
+            stats.extend(host.stats_sampler.latest())
+
+        if needle:
+            stats = [s for s in stats if needle in s.container.name.lower()]
+
+        if not stats:
+            return RenderResultListAction([
+                ExtensionResultItem(icon=self.extension.icon_path,
+                                    name='Sampling container stats...',
+                                    description='Type again in a moment to refresh',
+                                    highlightable=False,
+                                    on_enter=HideWindowAction())
+            ])
+
+        stats.sort(key=sort_key, reverse=True)
+
+        items = []
+        for stat in stats[:8]:
+            container = stat.container
+            items.append(
+                ExtensionResultItem(
+                    icon=self.extension.icon_path,
+                    name='%s  %.1f%% CPU  %s' % (container.name, stat.cpu_percent,
+                                                 format_bytes(stat.mem_usage)),
+                    description='MEM %.1f%% of %s | NET in %s/s out %s/s | IO read %s/s write %s/s' % (
+                        stat.mem_percent, format_bytes(stat.mem_limit),
+                        format_bytes(stat.net_rx_rate), format_bytes(stat.net_tx_rate),
+                        format_bytes(stat.blk_read_rate), format_bytes(stat.blk_write_rate)),
+                    highlightable=False,
+                    on_enter=ExtensionCustomAction(
+                        {
+                            'action': ACTION_DETAIL_CONTAINER,
+                            'container_id': container.id,
+                            'host': container.host
+                        },
+                        keep_app_open=True)))
+
+        return RenderResultListAction(items)
@@ -0,0 +1,55 @@
+import unittest
+
+from dk.bulk import DEPENDS_ON_LABEL, dependency_levels, parse_depends_on
+from dk.container_summary import ContainerSummary
+from dk.search import COMPOSE_PROJECT_LABEL, COMPOSE_SERVICE_LABEL
+
+
+def service(name, depends_on='', project='shop'):
+    labels = {COMPOSE_PROJECT_LABEL: project, COMPOSE_SERVICE_LABEL: name}
+    if depends_on:
+        labels[DEPENDS_ON_LABEL] = depends_on
+    return ContainerSummary(id='%s-%s' % (project, name), name='%s-%s-1' % (project, name),
+                            image='app', status='exited', labels=labels)
+
+
+def names(levels):
+    return [sorted(c.name for c in level) for level in levels]
+
+
+class DependencyLevelsTestCase(unittest.TestCase):
+
+    def test_parse_depends_on(self):
+        self.assertEqual(parse_depends_on('db:service_healthy:false, cache:service_started:true'),
+                         {'db', 'cache'})
+        self.assertEqual(parse_depends_on(None), set())
+
+    def test_dependencies_come_first(self):
+        levels = dependency_levels([
+            service('web', 'api:service_started:false'),
+            service('api', 'db:service_healthy:false,cache:service_started:false'),
+            service('db'),
+            service('cache'),
+        ])
+        self.assertEqual(names(levels), [['shop-cache-1', 'shop-db-1'], ['shop-api-1'], ['shop-web-1']])
+
+    def test_dependencies_outside_the_operation_are_ignored(self):
+        levels = dependency_levels([service('api', 'db:service_healthy:false')])
+        self.assertEqual(names(levels), [['shop-api-1']])
+
+    def test_services_of_other_projects_do_not_constrain(self):
+        levels = dependency_levels([service('api', 'db:service_started:false', project='shop'),
+                                    service('db', project='blog')])
+        self.assertEqual(names(levels), [['blog-db-1', 'shop-api-1']])
+
+    def test_cycles_run_together(self):
+        levels = dependency_levels([
+            service('db'),
+            service('a', 'b:service_started:false,db:service_started:false'),
+            service('b', 'a:service_started:false'),
+        ])
+        self.assertEqual(names(levels), [['shop-db-1'], ['shop-a-1', 'shop-b-1']])
+
+    def test_containers_without_compose_labels(self):
+        plain = ContainerSummary(id='x', name='x', image='app', status='exited')
+        self.assertEqual(dependency_levels([plain]), [[plain]])
@@ -0,0 +1,59 @@
+import threading
+import unittest
+from unittest import mock
+
+from dk.connection import DockerConnection, STATE_CONNECTED, STATE_DISCONNECTED
+
+
+class DockerConnectionTestCase(unittest.TestCase):
+
+    def test_close_ends_the_retry_loop(self):
+        connection = DockerConnection(endpoint='tcp://removed:2376')
+        connection.RETRY_DELAY = 0.01
+        attempts = []
+
+        def attempt():
+            attempts.append(1)
+            if len(attempts) == 2:
+                connection.close()
+            connection.state = STATE_DISCONNECTED
+            return False
+
+        with mock.patch.object(connection, '_attempt', side_effect=attempt):
+            loop = threading.Thread(target=connection._retry_loop, daemon=True)
+            loop.start()
+            loop.join(2)
+        self.assertFalse(loop.is_alive())
+        self.assertEqual(len(attempts), 2)
+
+    def test_closed_connection_does_not_connect(self):
+        connection = DockerConnection(endpoint='tcp://removed:2376')
+        connection.close()
+        with mock.patch.object(connection, '_attempt') as attempt:
+            connection.connect()
+        attempt.assert_not_called()
+        self.assertFalse(connection.available)
+
+    def test_on_connect_runs_before_connected_is_published(self):
+        states = []
+        connection = DockerConnection(on_connect=lambda client: states.append(connection.state))
+        client = mock.Mock()
+        with mock.patch.object(connection, '_create_client', return_value=client):
+            self.assertTrue(connection._attempt())
+        self.assertEqual(len(states), 1)
+        self.assertNotEqual(states[0], STATE_CONNECTED)
+        self.assertEqual(connection.state, STATE_CONNECTED)
+        self.assertIs(connection.client, client)
+
+    def test_ssh_endpoints_use_the_ssh_binary(self):
+        docker = mock.Mock()
+        DockerConnection(endpoint='ssh://user@build2')._create_client(docker)
+        DockerConnection(endpoint='tcp://build1:2376')._create_client(docker)
+        self.assertEqual([c[1]['use_ssh_client'] for c in docker.DockerClient.call_args_list],
+                         [True, False])
+
+    def test_ssh_docker_host_uses_the_ssh_binary(self):
+        docker = mock.Mock()
+        with mock.patch.dict('os.environ', {'DOCKER_HOST': 'ssh://user@build2'}):
+            DockerConnection()._create_client(docker)
+        self.assertTrue(docker.from_env.call_args[1]['use_ssh_client'])
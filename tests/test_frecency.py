@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from dk.container_index import ContainerIndex
+from dk.container_summary import ContainerSummary
+from dk.frecency import FrecencyStore
+
+try:
+    from dk.extension import DockerExtension
+except ImportError:
+    DockerExtension = None
+
+CONTAINER_ID = 'a' * 64
+
+
+class FrecencyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = tempfile.TemporaryDirectory()
+        patcher = mock.patch.dict(os.environ, {'XDG_CACHE_HOME': self.cache.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.cache.cleanup)
+        self.index = ContainerIndex(host='local')
+        self.index.replace([ContainerSummary(CONTAINER_ID, 'web', 'nginx', 'running')])
+        self.frecency = FrecencyStore()
+        self.addCleanup(self._cancel_save)
+
+    def _cancel_save(self):
+        if self.frecency._save_timer is not None:
+            self.frecency._save_timer.cancel()
+
+    def test_resolve_short_id(self):
+        self.assertEqual(self.index.resolve(CONTAINER_ID[:12]).name, 'web')
+        self.assertEqual(self.index.resolve(CONTAINER_ID).name, 'web')
+        self.assertIsNone(self.index.resolve('b' * 12))
+
+    def test_visit_accumulates(self):
+        self.frecency.visit('web')
+        self.frecency.visit('web')
+        self.assertAlmostEqual(self.frecency.score('web'), 2.0, places=3)
+
+    def test_short_id_visit_is_counted(self):
+        self.assertTrue(self.frecency.visit_container(self.index, CONTAINER_ID[:12]))
+        self.assertFalse(self.frecency.visit_container(self.index, 'b' * 12))
+        self.assertAlmostEqual(self.frecency.score('web'), 1.0, places=3)
+
+    @unittest.skipIf(DockerExtension is None, 'ulauncher is not installed')
+    def test_short_id_action_is_counted(self):
+        extension = DockerExtension.__new__(DockerExtension)
+        extension._hosts = SimpleNamespace(get=lambda host: SimpleNamespace(
+            name='local', available=True, client=None, index=self.index))
+        extension.jobs = mock.Mock()
+        extension.frecency = self.frecency
+
+        extension._submit_action(CONTAINER_ID[:12], None, 'Stopping container %s',
+                                 extension._stop_container)
+
+        extension.jobs.submit.assert_called_once()
+        self.assertAlmostEqual(self.frecency.score('web'), 1.0, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
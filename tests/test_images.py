@@ -0,0 +1,26 @@
+import unittest
+
+from dk.container_index import ContainerIndex
+from dk.container_summary import ContainerSummary
+from dk.images import ImageUsage
+
+
+def container(id, name, image_id):
+    return ContainerSummary(id=id, name=name, image='app', status='running', image_id=image_id)
+
+
+class ImageUsageTestCase(unittest.TestCase):
+
+    def test_usage_follows_the_index(self):
+        index = ContainerIndex()
+        index.replace([container('a' * 64, 'api', 'sha256:1'),
+                       container('b' * 64, 'worker', 'sha256:1')])
+        usage = ImageUsage(index)
+        self.assertEqual(usage.get('sha256:1'), ['api', 'worker'])
+
+        index.upsert(container('a' * 64, 'api', 'sha256:2'))
+        self.assertEqual(usage.get('sha256:1'), ['worker'])
+        self.assertEqual(usage.get('sha256:2'), ['api'])
+
+        index.remove('b' * 64)
+        self.assertEqual(usage.get('sha256:1'), [])
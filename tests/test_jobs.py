@@ -0,0 +1,35 @@
+import threading
+import unittest
+
+from dk.jobs import JobExecutor, container_job_key
+
+
+class JobExecutorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.notifications = []
+        self.jobs = JobExecutor(self.notifications.append)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.jobs.shutdown(wait=True)
+
+    def test_bulk_job_holds_each_container(self):
+        api, worker, db = (container_job_key('local', c * 64) for c in 'abc')
+        self.assertTrue(self.jobs.submit((api, worker), 'Bulk stop', self.release.wait))
+
+        self.assertFalse(self.jobs.submit(api, 'Stopping api', self.release.wait))
+        self.assertFalse(self.jobs.submit((worker, db), 'Bulk stop', self.release.wait))
+        self.assertTrue(self.jobs.submit((db,), 'Bulk stop', self.release.wait))
+        self.assertEqual(self.notifications, ['Stopping api is already in progress',
+                                              'Bulk stop is already in progress'])
+
+    def test_keys_are_released_when_the_job_ends(self):
+        key = container_job_key('local', 'a' * 64)
+        self.release.set()
+        done = threading.Event()
+        self.assertTrue(self.jobs.submit((key,), 'Bulk start', done.set))
+        done.wait(1)
+        self.jobs.shutdown(wait=True)
+        self.assertEqual(self.jobs._running, {})
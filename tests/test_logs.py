@@ -0,0 +1,74 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from requests.exceptions import ConnectionError
+from urllib3.exceptions import ReadTimeoutError
+
+from dk.container_index import ContainerIndex
+from dk.container_summary import ContainerSummary
+from dk.logs import LogBuffer, LogBuffers, is_read_timeout
+
+CONTAINER_ID = 'a' * 64
+
+
+class QuietStream():
+    """ Yields its chunks, then fails like a stream left quiet past the read timeout """
+
+    def __init__(self, chunks, timeout):
+        self.chunks = chunks
+        self.timeout = timeout
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield chunk
+        if self.timeout:
+            raise ConnectionError(ReadTimeoutError(None, None, 'Read timed out.'))
+
+    def close(self):
+        pass
+
+
+class LogBufferTestCase(unittest.TestCase):
+
+    def test_read_timeout_detection(self):
+        self.assertTrue(is_read_timeout(ConnectionError(ReadTimeoutError(None, None, 'Read timed out.'))))
+        self.assertFalse(is_read_timeout(ConnectionError('Connection refused')))
+
+    def test_quiet_stream_is_reopened_without_error(self):
+        calls = []
+        streams = [
+            QuietStream([b'2024-01-01T10:00:00.000000000Z first\n'], timeout=True),
+            QuietStream([b'2024-01-01T10:01:00.000000000Z second\n'], timeout=False),
+        ]
+
+        def logs(container_id, **kwargs):
+            calls.append(kwargs)
+            return streams[len(calls) - 1]
+
+        buffer = LogBuffer(SimpleNamespace(api=SimpleNamespace(logs=logs)), CONTAINER_ID)
+        buffer.touch()
+        buffer._thread.join(5)
+
+        self.assertIsNone(buffer.error)
+        self.assertEqual([text for _, text in buffer.lines], ['first', 'second'])
+        self.assertEqual(len(calls), 2)
+        self.assertIn('since', calls[1])
+        buffer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+class LogBuffersTestCase(unittest.TestCase):
+
+    def test_destroyed_container_stops_being_followed(self):
+        index = ContainerIndex()
+        index.replace([ContainerSummary(id=CONTAINER_ID, name='api', image='app', status='running')])
+        with mock.patch('dk.logs.LogBuffer'):
+            buffers = LogBuffers(mock.Mock(), index)
+            buffer = buffers.get(CONTAINER_ID)
+            index.remove(CONTAINER_ID)
+        buffer.close.assert_called_once_with()
+        self.assertEqual(len(buffers._buffers), 0)
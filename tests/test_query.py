@@ -0,0 +1,77 @@
+import unittest
+
+from dk.container_index import ContainerIndex
+from dk.container_summary import ContainerSummary
+from dk.query import ContainerQuery, parse_query
+from dk.search import FILTER_IMAGE, FILTER_IP, FILTER_PUBLISH, FILTER_STATUS
+
+
+class ParseQueryTestCase(unittest.TestCase):
+
+    def test_free_text_only(self):
+        query = parse_query('billing api')
+        self.assertEqual(query.text, 'billing api')
+        self.assertEqual(query.filters, [])
+        self.assertFalse(query.has_status)
+
+    def test_filters_and_text(self):
+        query = parse_query('status:exited image:Postgres billing')
+        self.assertEqual(query.text, 'billing')
+        self.assertEqual(query.filters, [(FILTER_STATUS, ('exited',)), (FILTER_IMAGE, ('postgres',))])
+        self.assertTrue(query.has_status)
+
+    def test_comma_and_repeated_terms_are_alternatives(self):
+        query = parse_query('status:exited,created status:dead')
+        self.assertEqual(query.filters, [(FILTER_STATUS, ('exited', 'created', 'dead'))])
+        self.assertEqual(parse_query('status:exited,,').filters, [(FILTER_STATUS, ('exited',))])
+
+    def test_status_all_lifts_the_running_default(self):
+        for raw in ('status:all web', 'status:any web'):
+            query = parse_query(raw)
+            self.assertEqual(query.filters, [])
+            self.assertTrue(query.any_status)
+            self.assertTrue(query.has_status)
+            self.assertEqual(query.text, 'web')
+
+    def test_host_port_shorthand(self):
+        self.assertEqual(parse_query(':8080').filters, [(FILTER_PUBLISH, ('8080',))])
+        self.assertEqual(parse_query(':53/udp').filters, [(FILTER_PUBLISH, ('53/udp',))])
+
+    def test_bare_ip_address(self):
+        query = parse_query('172.18.0.5')
+        self.assertEqual(query.filters, [(FILTER_IP, ('172.18.0.5',))])
+        self.assertEqual(query.text, '')
+
+    def test_unknown_fields_stay_free_text(self):
+        query = parse_query('foo:bar http://app')
+        self.assertEqual(query.filters, [])
+        self.assertEqual(query.text, 'foo:bar http://app')
+
+    def test_parsed_queries_are_returned_as_is(self):
+        query = ContainerQuery('web', 'web')
+        self.assertIs(parse_query(query), query)
+        self.assertEqual(parse_query(None).text, '')
+
+
+class IndexQueryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ContainerIndex()
+        self.index.replace([
+            ContainerSummary('a' * 64, 'web', 'nginx', 'running', ports=(('0.0.0.0', 8080, 80, 'tcp'),),
+                             networks={'shop': '172.18.0.5'}),
+            ContainerSummary('b' * 64, 'web-old', 'nginx', 'exited'),
+        ])
+
+    def names(self, query):
+        return [c.name for c in self.index.search(query)]
+
+    def test_status_filters(self):
+        self.assertEqual(self.names('web'), ['web'])
+        self.assertEqual(self.names('status:all web'), ['web', 'web-old'])
+        self.assertEqual(self.names('status:exited,created'), ['web-old'])
+
+    def test_reverse_lookups(self):
+        self.assertEqual(self.names(':8080'), ['web'])
+        self.assertEqual(self.names('172.18.0.5'), ['web'])
+        self.assertEqual(self.names(':9090'), [])
@@ -0,0 +1,42 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import docker
+
+from dk.container_index import ContainerIndex
+from dk.resource_stats import StatsSampler
+
+CONTAINER_ID = 'a' * 64
+
+PAYLOAD = {
+    'cpu_stats': {'cpu_usage': {'total_usage': 100}, 'system_cpu_usage': 1000, 'online_cpus': 2},
+    'memory_stats': {'usage': 2048, 'limit': 4096, 'stats': {}},
+}
+
+
+class StatsSamplerTestCase(unittest.TestCase):
+
+    def sample(self, version):
+        api = docker.APIClient(base_url='unix:///nonexistent.sock', version=version)
+        sampler = StatsSampler(SimpleNamespace(api=api), ContainerIndex(host='local'))
+        self.addCleanup(sampler._pool.shutdown)
+        with mock.patch.object(api, '_get') as get, \
+                mock.patch.object(api, '_result', return_value=PAYLOAD):
+            sample = sampler._sample_one(CONTAINER_ID)
+        return sample, get.call_args[1]['params']
+
+    def test_one_shot_on_recent_api(self):
+        sample, params = self.sample('1.41')
+        self.assertIsNotNone(sample)
+        self.assertTrue(params['one-shot'])
+
+    def test_no_one_shot_before_api_1_41(self):
+        sample, params = self.sample('1.40')
+        self.assertIsNotNone(sample)
+        self.assertNotIn('one-shot', params)
+        self.assertEqual(sample.mem_usage, 2048)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from dk.container_summary import ContainerSummary
+from dk.search import (COMPOSE_PROJECT_LABEL, COMPOSE_SERVICE_LABEL, FILTER_IMAGE,
+                       FILTER_PORT, FILTER_PUBLISH, FILTER_STATUS, ContainerMatcher)
+
+
+def container(id, name, image='app', status='running', labels=None, ports=None):
+    return ContainerSummary(id=id * 64, name=name, image=image, status=status,
+                            labels=labels, ports=ports)
+
+
+class ContainerMatcherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = ContainerMatcher()
+        for summary in (
+                container('a', 'billing-api', image='ghcr.io/acme/billing:1.2',
+                          labels={COMPOSE_PROJECT_LABEL: 'billing', COMPOSE_SERVICE_LABEL: 'api'},
+                          ports=(('0.0.0.0', 8080, 80, 'tcp'),)),
+                container('b', 'billing-db', image='postgres:16', status='exited',
+                          labels={COMPOSE_PROJECT_LABEL: 'billing', COMPOSE_SERVICE_LABEL: 'db'}),
+                container('c', 'api', image='nginx:latest', ports=(('', None, 80, 'tcp'),)),
+                container('d', 'worker', image='postgres:15')):
+            self.matcher.add(summary)
+
+    def test_exact_name_ranks_first(self):
+        self.assertEqual(self.matcher.rank('api')[:2], ['c' * 64, 'a' * 64])
+
+    def test_every_token_must_match(self):
+        self.assertEqual(self.matcher.rank('billing db'), ['b' * 64])
+        self.assertEqual(self.matcher.rank('billing nginx'), [])
+
+    def test_typos_fall_back_to_fuzzy_matches(self):
+        self.assertEqual(self.matcher.rank('workr', limit=1), ['d' * 64])
+
+    def test_limit_is_applied_after_ranking(self):
+        self.assertEqual(self.matcher.rank('api', limit=1), ['c' * 64])
+
+    def test_predicate_and_boost(self):
+        self.assertEqual(self.matcher.rank('api', predicate=lambda cid: cid != 'c' * 64), ['a' * 64])
+        boosted = self.matcher.rank('api', boost=lambda name: 100 if name == 'billing-api' else 0)
+        self.assertEqual(boosted[0], 'a' * 64)
+
+    def test_filter_values_are_alternatives_and_fields_intersect(self):
+        self.assertEqual(self.matcher.filter_ids([(FILTER_STATUS, ('exited', 'created'))]), {'b' * 64})
+        self.assertEqual(self.matcher.filter_ids([(FILTER_IMAGE, ('postgres',)),
+                                                  (FILTER_STATUS, ('running',))]), {'d' * 64})
+
+    def test_filter_prefixes(self):
+        self.assertEqual(self.matcher.filter_ids([(FILTER_IMAGE, ('post',))]), {'b' * 64, 'd' * 64})
+        self.assertEqual(self.matcher.filter_ids([(FILTER_IMAGE, ('billing',))]), {'a' * 64})
+
+    def test_ports_only_match_exactly(self):
+        self.assertEqual(self.matcher.filter_ids([(FILTER_PORT, ('80',))]), {'a' * 64, 'c' * 64})
+        self.assertEqual(self.matcher.filter_ids([(FILTER_PORT, ('8',))]), set())
+        self.assertEqual(self.matcher.filter_ids([(FILTER_PUBLISH, ('8080/tcp',))]), {'a' * 64})
+
+    def test_rank_with_filters(self):
+        self.assertEqual(self.matcher.rank('billing', filters=[(FILTER_STATUS, ('running',))]), ['a' * 64])
+        self.assertEqual(self.matcher.rank('', filters=[(FILTER_STATUS, ('exited',))]), ['b' * 64])
+
+    def test_removed_containers_are_not_matched(self):
+        self.matcher.remove('c' * 64)
+        self.assertEqual(self.matcher.rank('api'), ['a' * 64])
+        self.assertEqual(self.matcher.filter_ids([(FILTER_PORT, ('80',))]), {'a' * 64})
@@ -0,0 +1,32 @@
+import unittest
+from unittest import mock
+
+from dk.snapshot import CachedSnapshot
+
+
+class CachedSnapshotTestCase(unittest.TestCase):
+
+    def test_failed_refresh_keeps_the_error_and_backs_off(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            raise OSError('404 page not found')
+
+        snapshot = CachedSnapshot('df', fetch)
+        self.assertIsNone(snapshot.get(wait=1))
+        self.assertIsInstance(snapshot.error, OSError)
+
+        for _ in range(5):
+            snapshot.get(wait=1)
+        self.assertEqual(len(calls), 1)
+
+    def test_invalidate_retries_right_away(self):
+        snapshot = CachedSnapshot('df', lambda: 1 / 0)
+        snapshot.get(wait=1)
+        self.assertIsInstance(snapshot.error, ZeroDivisionError)
+
+        snapshot.invalidate()
+        with mock.patch.object(snapshot, 'refresh') as refresh:
+            snapshot.get()
+        refresh.assert_called_once_with()